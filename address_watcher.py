@@ -0,0 +1,260 @@
+import asyncio
+import zlib
+from blockfrost import ApiError
+from config import ADDRESS_WATCH_WORKERS
+
+# Seitengröße der Blockfrost-Abfrage von Adress-Transaktionen (Maximum der API)
+TX_PAGE_SIZE = 100
+
+# Cursor einer Adresse ohne Transaktionen
+EMPTY_CURSOR = "0:0"
+
+
+def parse_cursor(cursor):
+    """Wandelt einen Cursor "block_height:tx_index" in ein vergleichbares Tupel um."""
+    height, index = cursor.split(":")
+    return int(height), int(index)
+
+
+def fetch_latest_cursor(api, address):
+    """
+    Ermittelt den Cursor der neuesten Transaktion einer Adresse.
+
+    :return: Cursor "block_height:tx_index" (EMPTY_CURSOR für unbenutzte Adressen)
+    """
+    try:
+        transactions = api.address_transactions(address, count=1, order="desc")
+    except ApiError as e:
+        if getattr(e, "status_code", None) == 404:
+            return EMPTY_CURSOR
+        raise
+    if not transactions:
+        return EMPTY_CURSOR
+    return f"{transactions[0].block_height}:{transactions[0].tx_index}"
+
+
+def fetch_new_transactions(api, address, cursor):
+    """
+    Lädt alle Transaktionen einer Adresse nach dem Cursor, aufsteigend sortiert.
+
+    :param api: Blockfrost-Client
+    :param address: Bech32-Adresse
+    :param cursor: Zuletzt gesehene Transaktion ("block_height:tx_index")
+    :return: Liste der neuen Transaktionen
+    """
+    position = parse_cursor(cursor)
+    transactions = []
+    page = 1
+    while True:
+        try:
+            batch = api.address_transactions(
+                address, from_block=cursor, order="asc", count=TX_PAGE_SIZE, page=page
+            )
+        except ApiError as e:
+            if getattr(e, "status_code", None) == 404:
+                break
+            raise
+        # from_block ist inklusiv: bereits gesehene Transaktionen überspringen
+        transactions.extend(tx for tx in batch if (tx.block_height, tx.tx_index) > position)
+        if len(batch) < TX_PAGE_SIZE:
+            break
+        page += 1
+    return transactions
+
+
+class AddressWatcher:
+    """
+    Benachrichtigt Abonnenten über neue Transaktionen ihrer Wallet-Adressen.
+
+    Statt alle Adressen regelmäßig abzufragen, wird pro neuem Block die Liste
+    der betroffenen Adressen (blocks_addresses) mit den abonnierten Adressen
+    abgeglichen. Nur Treffer werden ab ihrem Cursor inkrementell nachgeladen.
+    Jede Adresse ist fest einem Worker zugeordnet, sodass ihr Cursor nie
+    gleichzeitig von zwei Coroutinen fortgeschrieben wird.
+
+    Mit ``shared=True`` werden die Abonnements vor jeder Blockverarbeitung aus
+    dem Wallet-Index neu gelesen; so übernimmt ein Prozess auch Abonnements,
+    die andere Prozesse angelegt haben (Mehrprozessbetrieb).
+    """
+
+    def __init__(self, cardano_manager, wallet_manager, block_follower, notify,
+                 workers=ADDRESS_WATCH_WORKERS, shared=False):
+        """
+        :param notify: Async-Callback (subscription, change) für jede Benachrichtigung
+        :param shared: Abonnements bei jedem Block aus dem Index synchronisieren
+        """
+        self.cardano_manager = cardano_manager
+        self.wallet_manager = wallet_manager
+        self.block_follower = block_follower
+        self.notify = notify
+        self.worker_count = max(1, workers)
+        self.shared = shared
+        # network -> {address: [subscription, ...]}
+        self._subscriptions = {}
+        # (network, address) -> zuletzt gemeldeter Kontostand (Balance)
+        self._balances = {}
+        self._queues = []
+        self._workers = []
+        self._started = False
+
+    def start(self, networks):
+        """Lädt die gespeicherten Abonnements und startet die Worker (einmalig)."""
+        if self._started:
+            return
+        self._started = True
+        self._queues = [asyncio.Queue() for _ in range(self.worker_count)]
+        self._workers = [
+            asyncio.get_running_loop().create_task(self._worker(queue)) for queue in self._queues
+        ]
+        for network in networks:
+            for subscription in self.wallet_manager.get_subscriptions(network):
+                self._add(subscription)
+            if self.shared:
+                # Auch ohne eigene Abonnements auf neue Blöcke hören, um fremde zu übernehmen
+                self.block_follower.add_listener(network, self._on_blocks)
+
+    def subscribe(self, subscription):
+        """Nimmt ein neu angelegtes Abonnement in die Überwachung auf."""
+        if not self._started:
+            # start() lädt alle gespeicherten Abonnements, auch dieses
+            return
+        self._add(subscription)
+
+    def unsubscribe(self, user_id, network, wallet_name):
+        """Entfernt ein Abonnement aus der Überwachung."""
+        addresses = self._subscriptions.get(network, {})
+        for address, subscriptions in list(addresses.items()):
+            subscriptions[:] = [
+                subscription for subscription in subscriptions
+                if not (subscription["user_id"] == str(user_id) and subscription["name"] == wallet_name)
+            ]
+            if not subscriptions:
+                del addresses[address]
+                self._balances.pop((network, address), None)
+        if not addresses and not self.shared:
+            self.block_follower.remove_listener(network, self._on_blocks)
+
+    def address_count(self, network=None):
+        """Anzahl der überwachten Adressen (gesamt oder pro Netzwerk)."""
+        if network:
+            return len(self._subscriptions.get(network, {}))
+        return sum(len(addresses) for addresses in self._subscriptions.values())
+
+    def _add(self, subscription):
+        """Registriert ein Abonnement und initialisiert bei Bedarf den Cursor der Adresse."""
+        network = subscription["network"]
+        address = subscription["address"]
+        addresses = self._subscriptions.setdefault(network, {})
+        is_new = address not in addresses
+        subscriptions = addresses.setdefault(address, [])
+        # Erneutes Abonnieren ersetzt den alten Eintrag (z.B. anderer Chat)
+        subscriptions[:] = [
+            existing for existing in subscriptions
+            if (existing["user_id"], existing["name"]) != (subscription["user_id"], subscription["name"])
+        ]
+        subscriptions.append(subscription)
+        if is_new and self.wallet_manager.index.get_cursor(network, address) is None:
+            self._enqueue(network, address)
+        self.block_follower.add_listener(network, self._on_blocks)
+
+    def _enqueue(self, network, address):
+        """Ordnet eine Adresse stabil einem Worker zu."""
+        shard = zlib.crc32(address.encode()) % self.worker_count
+        self._queues[shard].put_nowait((network, address))
+
+    def _reload(self, network):
+        """Gleicht die Abonnements eines Netzwerks mit dem Wallet-Index ab."""
+        current = {}
+        for subscription in self.wallet_manager.get_subscriptions(network):
+            current.setdefault(subscription["address"], []).append(subscription)
+        known = self._subscriptions.get(network, {})
+        for address in known.keys() - current.keys():
+            self._balances.pop((network, address), None)
+        for address in current.keys() - known.keys():
+            if self.wallet_manager.index.get_cursor(network, address) is None:
+                self._enqueue(network, address)
+        self._subscriptions[network] = current
+
+    async def _on_blocks(self, network, blocks):
+        """Ermittelt die abonnierten Adressen, die in den neuen Blöcken vorkommen."""
+        if self.shared:
+            self._reload(network)
+        addresses = self._subscriptions.get(network)
+        api = self.cardano_manager.get_api(network)
+        if not addresses or not api:
+            return
+
+        touched = set()
+        for block in blocks:
+            if not block.tx_count:
+                continue
+            block_addresses = await self.cardano_manager._run_blocking(
+                api.blocks_addresses, block.hash, gather_pages=True
+            )
+            touched.update(entry.address for entry in block_addresses if entry.address in addresses)
+
+        for address in touched:
+            self._enqueue(network, address)
+
+    async def _worker(self, queue):
+        """Arbeitet die Adressen eines Shards nacheinander ab."""
+        while True:
+            network, address = await queue.get()
+            try:
+                await self._sync_address(network, address)
+            except Exception as e:
+                print(f"Fehler bei der Adressüberwachung ({address[:12]}...): {e}")
+            finally:
+                queue.task_done()
+
+    async def _sync_address(self, network, address):
+        """Lädt neue Transaktionen einer Adresse und benachrichtigt bei Änderungen."""
+        api = self.cardano_manager.get_api(network)
+        if not api:
+            return
+        run = self.cardano_manager._run_blocking
+        index = self.wallet_manager.index
+
+        cursor = index.get_cursor(network, address)
+        if cursor is None:
+            # Neues Abonnement: Verlauf nicht melden, nur die Startposition merken
+            index.set_cursor(network, address, await run(fetch_latest_cursor, api, address))
+            return
+
+        transactions = await run(fetch_new_transactions, api, address, cursor)
+        if not transactions:
+            return
+        latest = transactions[-1]
+        index.set_cursor(network, address, f"{latest.block_height}:{latest.tx_index}")
+
+        # Alten Stand für die Differenz merken, dann Cache und UTXOs der Adresse erneuern
+        previous = self._balances.get((network, address))
+        if previous is None:
+            cached = self.cardano_manager.balance_cache.lookup((network, address))[0]
+            previous = cached["balance"] if cached else None
+        self.cardano_manager.utxo_index.invalidate(network, address)
+        result = await self.cardano_manager.check_wallet_balance_async(address, network, use_cache=False)
+        if "error" in result:
+            return
+        balance = result["balance"]
+        self._balances[(network, address)] = balance
+
+        change = {
+            "network": network,
+            "address": address,
+            "tx_hashes": [tx.tx_hash for tx in transactions],
+            "balance": balance,
+            "diff": balance.diff(previous) if previous is not None else None
+        }
+        for subscription in list(self._subscriptions.get(network, {}).get(address, [])):
+            try:
+                await self.notify(subscription, change)
+            except Exception as e:
+                print(f"Fehler beim Senden der Zahlungsbenachrichtigung: {e}")
+
+    def stop(self):
+        """Beendet die Worker."""
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
+        self._started = False
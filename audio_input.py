@@ -1,39 +1,141 @@
 import os
+import math
 import tempfile
-import speech_recognition as sr
-import openai
-import pyaudio
+from array import array
 import wave
-from config import OPENAI_API_KEY, AUDIO_RECORDING_TIMEOUT, AUDIO_SAMPLE_RATE, AUDIO_CHANNELS
+from speech_to_text import get_stt_backend
+from audio_preprocessing import preprocess_audio
+from config import (
+    AUDIO_RECORDING_TIMEOUT, AUDIO_SAMPLE_RATE, AUDIO_CHANNELS,
+    AUDIO_VAD_ENABLED, AUDIO_VAD_FRAME_MS, AUDIO_VAD_SILENCE_MS, AUDIO_VAD_PREROLL_MS,
+    AUDIO_MAX_RECORDING_SECONDS
+)
+
+
+def frame_rms(data):
+    """Berechnet die RMS-Energie eines Frames mit 16-Bit-Samples."""
+    samples = array('h', data)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+
+class CaptureRingBuffer:
+    """
+    Vorab allokierter Ringpuffer für Mikrofon-Frames.
+    
+    Vor Sprachbeginn wird zyklisch überschrieben; ab Sprachbeginn (inklusive
+    Vorlauf) wird bis zur Kapazität aufgenommen, ohne Daten zu überschreiben.
+    """
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self.written = 0
+        self.start = 0
+    
+    def write(self, data):
+        """Schreibt einen Frame an die aktuelle Position (mit Umbruch am Pufferende)."""
+        position = self.written % self.capacity
+        first = min(len(data), self.capacity - position)
+        self._view[position:position + first] = data[:first]
+        if first < len(data):
+            self._view[0:len(data) - first] = data[first:]
+        self.written += len(data)
+    
+    def skip(self):
+        """Verschiebt den Aufnahmebeginn an die aktuelle Position (Daten bleiben als Vorlauf erhalten)."""
+        self.start = self.written
+    
+    def mark_start(self, preroll_bytes):
+        """Legt den Aufnahmebeginn einschließlich Vorlauf fest."""
+        self.start = max(self.written - min(preroll_bytes, self.capacity), 0)
+    
+    @property
+    def captured(self):
+        """Anzahl der Bytes seit dem Aufnahmebeginn."""
+        return self.written - self.start
+    
+    def is_full(self, frame_bytes):
+        """Prüft, ob ein weiterer Frame den Aufnahmebereich überschreiben würde."""
+        return self.captured + frame_bytes > self.capacity
+    
+    def getvalue(self):
+        """Gibt die Bytes vom Aufnahmebeginn bis zur aktuellen Position zurück."""
+        begin = self.start % self.capacity
+        end = self.written % self.capacity
+        if self.captured == 0:
+            return b''
+        if begin < end:
+            return bytes(self._view[begin:end])
+        return bytes(self._view[begin:]) + bytes(self._view[:end])
 
-# OpenAI API-Key setzen
-openai.api_key = OPENAI_API_KEY
 
 class AudioProcessor:
     def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.mic = sr.Microphone()
-        
-        # Hintergrundgeräusche kalibrieren
-        with self.mic as source:
-            self.recognizer.adjust_for_ambient_noise(source)
+        # Spracherkennung und Mikrofon werden erst bei der ersten Aufnahme vorbereitet
+        self._stt = None
+        self.recognizer = None
+    
+    @property
+    def stt(self):
+        """Spracherkennungs-Backend, beim ersten Zugriff geladen."""
+        if self._stt is None:
+            self._stt = get_stt_backend()
+        return self._stt
+    
+    def calibrate(self):
+        """Kalibriert das Mikrofon auf die Hintergrundgeräusche (einmalig)."""
+        if self.recognizer is not None:
+            return
+        import speech_recognition as sr
+        recognizer = sr.Recognizer()
+        with sr.Microphone() as source:
+            recognizer.adjust_for_ambient_noise(source)
+        self.recognizer = recognizer
         print("Mikrofon kalibriert und bereit.")
         
-    def record_audio(self, timeout=AUDIO_RECORDING_TIMEOUT):
-        """Nimmt Audio über das Mikrofon auf und gibt den Dateipfad zurück."""
-        print(f"Aufnahme startet... (Sprechen Sie jetzt - {timeout} Sekunden)")
+    def record_audio(self, timeout=AUDIO_RECORDING_TIMEOUT, vad=AUDIO_VAD_ENABLED):
+        """
+        Nimmt Audio über das Mikrofon auf und gibt den Dateipfad zurück.
+        
+        Mit VAD endet die Aufnahme nach einer Sprechpause von AUDIO_VAD_SILENCE_MS,
+        spätestens nach AUDIO_MAX_RECORDING_SECONDS. Beginnt innerhalb von
+        ``timeout`` Sekunden keine Sprache, wird abgebrochen. Ohne VAD wird
+        genau ``timeout`` Sekunden aufgenommen.
+        """
+        if vad:
+            print("Aufnahme startet... (Sprechen Sie jetzt - Ende bei Sprechpause)")
+        else:
+            print(f"Aufnahme startet... (Sprechen Sie jetzt - {timeout} Sekunden)")
+        
+        import pyaudio
+        self.calibrate()
         
         # Temp-Datei für die Audioaufnahme erstellen
         temp_file = tempfile.mktemp(suffix=".wav")
         
         # Aufnahme-Parameter
-        chunk = 1024
         format = pyaudio.paInt16
         channels = AUDIO_CHANNELS
         rate = AUDIO_SAMPLE_RATE
+        chunk = int(rate * AUDIO_VAD_FRAME_MS / 1000)
         
         # PyAudio-Instanz erstellen
         p = pyaudio.PyAudio()
+        sample_width = p.get_sample_size(format)
+        frame_bytes = chunk * channels * sample_width
+        bytes_per_ms = rate * channels * sample_width / 1000
+        
+        max_seconds = AUDIO_MAX_RECORDING_SECONDS if vad else timeout
+        ring = CaptureRingBuffer(int(max_seconds * 1000 * bytes_per_ms) // frame_bytes * frame_bytes)
+        
+        # Schwelle aus der Kalibrierung der Hintergrundgeräusche
+        threshold = self.recognizer.energy_threshold
+        speech_started = not vad
+        silent_ms = 0
+        waited_ms = 0
         
         # Stream öffnen
         stream = p.open(format=format,
@@ -42,40 +144,61 @@ class AudioProcessor:
                         input=True,
                         frames_per_buffer=chunk)
         
-        frames = []
-        
-        # Aufnahme für die angegebene Zeit
-        for _ in range(0, int(rate / chunk * timeout)):
-            data = stream.read(chunk)
-            frames.append(data)
+        try:
+            while not ring.is_full(frame_bytes):
+                data = stream.read(chunk, exception_on_overflow=False)
+                ring.write(data)
+                
+                if not vad:
+                    continue
+                
+                if frame_rms(data) > threshold:
+                    if not speech_started:
+                        speech_started = True
+                        ring.mark_start(int(AUDIO_VAD_PREROLL_MS * bytes_per_ms) // frame_bytes * frame_bytes)
+                    silent_ms = 0
+                elif speech_started:
+                    silent_ms += AUDIO_VAD_FRAME_MS
+                    if silent_ms >= AUDIO_VAD_SILENCE_MS:
+                        break
+                else:
+                    # Vor Sprachbeginn nur den Vorlauf behalten
+                    waited_ms += AUDIO_VAD_FRAME_MS
+                    ring.skip()
+                    if waited_ms >= timeout * 1000:
+                        break
+        finally:
+            # Stream beenden
+            stream.stop_stream()
+            stream.close()
+            p.terminate()
         
         print("Aufnahme beendet.")
         
-        # Stream beenden
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
+        if not speech_started:
+            print("Keine Sprache erkannt.")
+            return None
         
         # Aufnahme in Datei speichern
         wf = wave.open(temp_file, 'wb')
         wf.setnchannels(channels)
-        wf.setsampwidth(p.get_sample_size(format))
+        wf.setsampwidth(sample_width)
         wf.setframerate(rate)
-        wf.writeframes(b''.join(frames))
+        wf.writeframes(ring.getvalue())
         wf.close()
         
         return temp_file
     
     def transcribe_with_whisper(self, audio_file_path):
-        """Transkribiert die Audiodatei mit OpenAI Whisper API."""
+        """Transkribiert die Audiodatei mit dem konfigurierten Whisper-Backend (API oder lokal)."""
         try:
-            with open(audio_file_path, "rb") as audio_file:
-                transcription = openai.Audio.transcribe(
-                    model="whisper-1",
-                    file=audio_file
-                )
+            # 44,1-kHz-Aufnahme auf 16 kHz mono reduzieren und Stille kürzen
+            prepared = preprocess_audio(audio_file_path, "wav")
+            if not isinstance(prepared, str):
+                return self.stt.transcribe(prepared)
             
-            return transcription["text"]
+            with open(audio_file_path, "rb") as audio_file:
+                return self.stt.transcribe(audio_file)
         except Exception as e:
             print(f"Fehler bei der Transkription: {e}")
             return None
@@ -0,0 +1,104 @@
+import io
+import os
+import numpy as np
+from pydub import AudioSegment
+from config import (
+    AUDIO_PREPROCESS_ENABLED, AUDIO_PREPROCESS_SAMPLE_RATE,
+    AUDIO_SILENCE_THRESHOLD_DB, AUDIO_SILENCE_PADDING_MS
+)
+
+# Fensterlänge für die Energieberechnung
+FRAME_MS = 20
+
+
+def _frame_levels_db(segment):
+    """
+    Berechnet den Pegel (dBFS) pro 20-ms-Fenster.
+
+    Mit numpy vektorisiert über alle Fenster auf einmal.
+    """
+    frame_len = int(segment.frame_rate * FRAME_MS / 1000)
+    max_amplitude = float(segment.max_possible_amplitude)
+
+    samples = np.frombuffer(segment.raw_data, dtype=np.int16).astype(np.float32)
+    frame_count = len(samples) // frame_len
+    if frame_count == 0:
+        return []
+    frames = samples[:frame_count * frame_len].reshape(frame_count, frame_len)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return (20 * np.log10(np.maximum(rms, 1.0) / max_amplitude)).tolist()
+
+
+def trim_silence(segment, threshold_db=AUDIO_SILENCE_THRESHOLD_DB, padding_ms=AUDIO_SILENCE_PADDING_MS):
+    """
+    Entfernt Stille am Anfang und Ende einer Aufnahme.
+
+    :param segment: pydub AudioSegment (16 Bit)
+    :param threshold_db: Fenster unter diesem Pegel gelten als Stille
+    :param padding_ms: Rand, der um die Sprache herum erhalten bleibt
+    :return: Gekürztes AudioSegment (unverändert, wenn keine Sprache gefunden wird)
+    """
+    levels = _frame_levels_db(segment)
+    voiced = [index for index, level in enumerate(levels) if level > threshold_db]
+    if not voiced:
+        return segment
+
+    start_ms = max(voiced[0] * FRAME_MS - padding_ms, 0)
+    end_ms = min((voiced[-1] + 1) * FRAME_MS + padding_ms, len(segment))
+    return segment[start_ms:end_ms]
+
+
+def _input_size(audio):
+    """Gibt die Größe der Eingabe in Bytes zurück."""
+    if isinstance(audio, str):
+        return os.path.getsize(audio)
+    return len(audio.getbuffer())
+
+
+def preprocess_audio(audio, audio_format=None):
+    """
+    Bereitet eine Aufnahme für die Transkription vor.
+
+    Die Aufnahme wird auf 16 kHz mono reduziert, Stille am Anfang und Ende wird
+    entfernt und das Ergebnis kompakt als Ogg/Opus kodiert.
+
+    :param audio: Pfad oder Dateiobjekt (BytesIO) mit der Aufnahme
+    :param audio_format: Optionales Eingabeformat (z.B. "ogg" oder "wav")
+    :return: BytesIO mit der vorverarbeiteten Aufnahme oder die unveränderte Eingabe
+    """
+    if not AUDIO_PREPROCESS_ENABLED:
+        return audio
+
+    try:
+        if not isinstance(audio, str):
+            audio.seek(0)
+        original_size = _input_size(audio)
+
+        segment = AudioSegment.from_file(audio, format=audio_format)
+        original_ms = len(segment)
+        segment = (
+            segment.set_channels(1)
+            .set_frame_rate(AUDIO_PREPROCESS_SAMPLE_RATE)
+            .set_sample_width(2)
+        )
+        segment = trim_silence(segment)
+
+        output = io.BytesIO()
+        segment.export(output, format="ogg", codec="libopus", bitrate="24k")
+        # Die Whisper-API leitet das Format aus dem Dateinamen ab
+        output.name = "voice.ogg"
+        output.seek(0)
+
+        processed_size = len(output.getbuffer())
+        print(
+            f"Audio vorverarbeitet: {original_ms} ms -> {len(segment)} ms, "
+            f"{original_size} -> {processed_size} Bytes "
+            f"({original_size - processed_size} Bytes gespart)"
+        )
+        return output
+
+    except Exception as e:
+        print(f"Fehler bei der Audio-Vorverarbeitung, verwende Original: {e}")
+        if not isinstance(audio, str):
+            audio.seek(0)
+        return audio
@@ -0,0 +1,104 @@
+LOVELACE_PER_ADA = 1000000
+
+# Länge der Policy-ID in Hex-Zeichen (28 Bytes)
+POLICY_ID_LENGTH = 56
+
+
+def split_unit(unit):
+    """Teilt eine Blockfrost-Unit in Policy-ID und Asset-Name (hex)."""
+    return unit[:POLICY_ID_LENGTH], unit[POLICY_ID_LENGTH:]
+
+
+def asset_display_name(asset_name_hex):
+    """Gibt den Asset-Namen lesbar zurück (UTF-8, sonst hex)."""
+    try:
+        name = bytes.fromhex(asset_name_hex).decode("utf-8")
+        if name and name.isprintable():
+            return name
+    except ValueError:
+        pass
+    return asset_name_hex or "(ohne Namen)"
+
+
+class Balance:
+    """
+    Kompakter, unveränderlicher Kontostand: Lovelace plus native Assets.
+
+    Assets werden als sortiertes Tupel ((policy_id, asset_name), menge) gehalten;
+    das ist speichersparend, hashbar und lässt sich günstig vergleichen.
+    """
+
+    __slots__ = ("lovelace", "assets")
+
+    def __init__(self, lovelace=0, assets=()):
+        self.lovelace = lovelace
+        self.assets = tuple(sorted(assets))
+
+    @classmethod
+    def from_amounts(cls, amounts):
+        """
+        Erstellt einen Kontostand aus der amount-Liste einer Blockfrost-Antwort.
+
+        :param amounts: Liste mit unit/quantity-Einträgen (address(...).amount)
+        """
+        lovelace = 0
+        assets = []
+        for amount in amounts:
+            if amount.unit == "lovelace":
+                lovelace += int(amount.quantity)
+            else:
+                assets.append((split_unit(amount.unit), int(amount.quantity)))
+        return cls(lovelace, assets)
+
+    @property
+    def ada(self):
+        """Kontostand in ADA."""
+        return self.lovelace / LOVELACE_PER_ADA
+
+    def asset_map(self):
+        """Gibt die Assets als Dict (policy_id, asset_name) -> Menge zurück."""
+        return dict(self.assets)
+
+    def diff(self, other):
+        """
+        Berechnet die Änderung gegenüber einem früheren Kontostand.
+
+        :param other: Früherer Kontostand (oder None)
+        :return: Dict mit 'lovelace' und 'assets' (nur Einträge ungleich 0)
+        """
+        if other is None:
+            other = Balance()
+        if self == other:
+            return {"lovelace": 0, "assets": {}}
+
+        asset_changes = {}
+        previous = other.asset_map()
+        for key, quantity in self.assets:
+            delta = quantity - previous.pop(key, 0)
+            if delta:
+                asset_changes[key] = delta
+        for key, quantity in previous.items():
+            asset_changes[key] = -quantity
+
+        return {"lovelace": self.lovelace - other.lovelace, "assets": asset_changes}
+
+    def to_dict(self):
+        """Gibt den Kontostand als serialisierbares Dict zurück."""
+        return {
+            "lovelace": self.lovelace,
+            "assets": [
+                {"policy_id": policy_id, "asset_name": asset_name, "quantity": quantity}
+                for (policy_id, asset_name), quantity in self.assets
+            ]
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Balance):
+            return NotImplemented
+        return self.lovelace == other.lovelace and self.assets == other.assets
+
+    def __hash__(self):
+        return hash((self.lovelace, self.assets))
+
+    def __repr__(self):
+        return f"Balance(lovelace={self.lovelace}, assets={len(self.assets)})"
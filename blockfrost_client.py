@@ -0,0 +1,163 @@
+import time
+import random
+import threading
+from concurrent.futures import Future
+from blockfrost import ApiError
+from config import (
+    BLOCKFROST_RATE_LIMIT, BLOCKFROST_BURST, BLOCKFROST_MAX_RETRIES,
+    BLOCKFROST_BACKOFF_BASE, BLOCKFROST_BACKOFF_MAX
+)
+
+# HTTP-Status, bei denen ein erneuter Versuch sinnvoll ist
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Threadsicherer Token-Bucket.
+
+    Entspricht dem Blockfrost-Limit: ``rate`` Anfragen pro Sekunde dauerhaft,
+    Bursts bis ``capacity`` Anfragen.
+    """
+
+    def __init__(self, rate=BLOCKFROST_RATE_LIMIT, capacity=BLOCKFROST_BURST):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Entnimmt ein Token und wartet, falls keines verfügbar ist.
+
+        :return: Wartezeit in Sekunden
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+# Anzahl der Prozesse, die sich das Limit einer Projekt-ID teilen
+_process_share = 1
+
+
+def set_process_share(processes):
+    """
+    Teilt Rate und Burst auf mehrere Prozesse auf (Mehrprozessbetrieb).
+
+    Jeder Prozess erhält 1/N des Limits, sodass alle Worker zusammen das
+    Blockfrost-Limit der Projekt-ID einhalten. Muss vor dem ersten
+    ``get_token_bucket`` aufgerufen werden.
+    """
+    global _process_share
+    _process_share = max(1, processes)
+
+
+def get_token_bucket(project_id):
+    """Gibt den prozessweit geteilten Token-Bucket einer Projekt-ID zurück."""
+    with _buckets_lock:
+        bucket = _buckets.get(project_id)
+        if bucket is None:
+            bucket = _buckets[project_id] = TokenBucket(
+                rate=BLOCKFROST_RATE_LIMIT / _process_share,
+                capacity=max(1, BLOCKFROST_BURST // _process_share)
+            )
+        return bucket
+
+
+def backoff_delay(attempt, base=BLOCKFROST_BACKOFF_BASE, maximum=BLOCKFROST_BACKOFF_MAX):
+    """Exponentielles Backoff mit vollem Jitter."""
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+
+class RateLimitedApi:
+    """
+    Wrapper um einen BlockFrostApi-Client.
+
+    Jeder Aufruf entnimmt ein Token aus dem Bucket der Projekt-ID, wiederholt
+    429/5xx-Fehler mit Backoff, und identische gleichzeitige Anfragen
+    (gleiche Methode, gleiche Argumente) teilen sich einen HTTP-Aufruf.
+    """
+
+    def __init__(self, api, bucket, max_retries=BLOCKFROST_MAX_RETRIES):
+        self._api = api
+        self._bucket = bucket
+        self._max_retries = max_retries
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "coalesced": 0, "retries": 0, "throttled_seconds": 0.0}
+
+    def __getattr__(self, name):
+        attribute = getattr(self._api, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            return self._call(name, attribute, args, kwargs)
+
+        return call
+
+    def _call(self, name, method, args, kwargs):
+        """Führt einen Aufruf aus oder hängt sich an einen identischen laufenden Aufruf an."""
+        try:
+            key = (name, args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            # Nicht hashbare Argumente: ohne Zusammenfassen ausführen
+            return self._call_with_retry(method, args, kwargs)
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._call_with_retry(method, args, kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _call_with_retry(self, method, args, kwargs):
+        """Führt einen Aufruf mit Rate-Limit und Backoff für 429/5xx aus."""
+        attempt = 0
+        while True:
+            waited = self._bucket.acquire()
+            # Zähler werden aus mehreren Executor-Threads aktualisiert
+            with self._lock:
+                self.stats["throttled_seconds"] += waited
+                self.stats["calls"] += 1
+            try:
+                return method(*args, **kwargs)
+            except ApiError as e:
+                status_code = getattr(e, "status_code", None)
+                if status_code not in RETRY_STATUS_CODES or attempt >= self._max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                attempt += 1
+                with self._lock:
+                    self.stats["retries"] += 1
+                print(f"Blockfrost {status_code}, neuer Versuch {attempt} in {delay:.2f}s")
+                time.sleep(delay)
@@ -0,0 +1,108 @@
+import time
+import threading
+from collections import OrderedDict
+
+# Zustände eines Cache-Treffers
+CACHE_FRESH = "fresh"
+CACHE_STALE = "stale"
+CACHE_MISS = "miss"
+
+
+class LRUCache:
+    """
+    Threadsicherer In-Prozess-Cache mit TTL, LRU-Verdrängung und Größenlimit.
+
+    Einträge sind bis ``ttl`` Sekunden frisch und werden danach noch bis
+    ``stale_ttl`` Sekunden als veraltet ausgeliefert (stale-while-revalidate),
+    bevor sie als Fehltreffer gelten.
+    """
+
+    def __init__(self, max_entries=1000, ttl=60, stale_ttl=0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        """
+        Sucht einen Eintrag und gibt (Wert, Zustand) zurück.
+
+        :param key: Cache-Schlüssel
+        :return: Tupel aus Wert (oder None) und CACHE_FRESH/CACHE_STALE/CACHE_MISS
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, CACHE_MISS
+
+            value, stored_at = entry
+            age = now - stored_at
+            if age > self.stale_ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None, CACHE_MISS
+
+            self._entries.move_to_end(key)
+            if age > self.ttl:
+                self.stale_hits += 1
+                return value, CACHE_STALE
+
+            self.hits += 1
+            return value, CACHE_FRESH
+
+    def get(self, key, default=None):
+        """Gibt einen frischen Eintrag zurück oder ``default``."""
+        value, state = self.lookup(key)
+        return value if state == CACHE_FRESH else default
+
+    def set(self, key, value):
+        """Speichert einen Eintrag und verdrängt bei Bedarf den ältesten."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Entfernt einen Eintrag aus dem Cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Leert den Cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def export(self):
+        """Gibt alle Einträge als Liste von (Schlüssel, Wert, Alter in Sekunden) zurück."""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value, now - stored_at) for key, (value, stored_at) in self._entries.items()]
+
+    def restore(self, entries):
+        """Übernimmt Einträge aus ``export()``; abgelaufene Einträge werden verworfen."""
+        now = time.monotonic()
+        with self._lock:
+            for key, value, age in entries:
+                if age <= self.stale_ttl:
+                    self._entries[key] = (value, now - age)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Gibt Treffer-Statistiken des Caches zurück."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses
+        }
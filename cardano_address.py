@@ -0,0 +1,170 @@
+CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+
+# Konstanten der Prüfsumme (BIP-173 / BIP-350)
+BECH32_CONST = 1
+BECH32M_CONST = 0x2bc830a3
+
+# Maximale Länge nach CIP-5 (Cardano hebt das 90-Zeichen-Limit von BIP-173 auf)
+MAX_LENGTH = 1023
+
+_GENERATOR = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)
+
+# Zeichen -> 5-Bit-Wert (-1 = ungültig)
+_CHARSET_REV = [-1] * 128
+for _index, _char in enumerate(CHARSET):
+    _CHARSET_REV[ord(_char)] = _index
+
+# Vorberechnete XOR-Kombinationen der Generatoren für alle 32 Werte der oberen 5 Bits
+_GEN_TABLE = []
+for _top in range(32):
+    _value = 0
+    for _bit in range(5):
+        if (_top >> _bit) & 1:
+            _value ^= _GENERATOR[_bit]
+    _GEN_TABLE.append(_value)
+
+# HRP und Netzwerk-ID im Header je Netzwerk
+NETWORK_HRP = {"mainnet": "addr", "testnet": "addr_test"}
+NETWORK_ID = {"mainnet": 1, "testnet": 0}
+
+# Erwartete Payload-Länge in Bytes je Adresstyp (Header >> 4); None = variabel (Pointer)
+_PAYLOAD_LENGTH = {
+    0: 57, 1: 57, 2: 57, 3: 57,  # Basisadressen
+    4: None, 5: None,            # Pointer-Adressen
+    6: 29, 7: 29                 # Enterprise-Adressen
+}
+
+
+def _polymod_step(checksum, value):
+    """Ein Schritt der Bech32-Prüfsumme mit Tabellen-Lookup."""
+    top = checksum >> 25
+    return ((checksum & 0x1ffffff) << 5) ^ value ^ _GEN_TABLE[top]
+
+
+def bech32_decode(bech):
+    """
+    Dekodiert einen Bech32/Bech32m-String.
+
+    :param bech: Zu dekodierender String
+    :return: Tupel (hrp, 5-Bit-Daten ohne Prüfsumme, Konstante) oder None
+    """
+    if not bech or len(bech) > MAX_LENGTH:
+        return None
+    if bech.lower() != bech and bech.upper() != bech:
+        return None
+    bech = bech.lower()
+
+    separator = bech.rfind('1')
+    if separator < 1 or separator + 7 > len(bech):
+        return None
+    hrp = bech[:separator]
+
+    checksum = 1
+    for char in hrp:
+        code = ord(char)
+        if code < 33 or code > 126:
+            return None
+        checksum = _polymod_step(checksum, code >> 5)
+    checksum = _polymod_step(checksum, 0)
+    for char in hrp:
+        checksum = _polymod_step(checksum, ord(char) & 31)
+
+    data = []
+    for char in bech[separator + 1:]:
+        code = ord(char)
+        value = _CHARSET_REV[code] if code < 128 else -1
+        if value < 0:
+            return None
+        checksum = _polymod_step(checksum, value)
+        data.append(value)
+
+    if checksum not in (BECH32_CONST, BECH32M_CONST):
+        return None
+    return hrp, data[:-6], checksum
+
+
+def _convert_bits(data, from_bits, to_bits):
+    """Wandelt 5-Bit-Gruppen in Bytes um (ohne Auffüllen)."""
+    accumulator = 0
+    bits = 0
+    result = bytearray()
+    max_value = (1 << to_bits) - 1
+    for value in data:
+        accumulator = (accumulator << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            result.append((accumulator >> bits) & max_value)
+    if bits >= from_bits or ((accumulator << (to_bits - bits)) & max_value):
+        return None
+    return bytes(result)
+
+
+def decode_address(address):
+    """
+    Dekodiert eine Shelley-Adresse.
+
+    :param address: Bech32-Adresse (addr1... oder addr_test1...)
+    :return: Dict mit 'network', 'type' und 'payload' oder None, wenn ungültig
+    """
+    decoded = bech32_decode(address)
+    if decoded is None:
+        return None
+    hrp, data, constant = decoded
+
+    # Cardano-Adressen verwenden Bech32, nicht Bech32m
+    if constant != BECH32_CONST:
+        return None
+
+    payload = _convert_bits(data, 5, 8)
+    if not payload:
+        return None
+
+    header = payload[0]
+    address_type = header >> 4
+    network_id = header & 0x0f
+
+    if address_type not in _PAYLOAD_LENGTH:
+        return None
+    expected_length = _PAYLOAD_LENGTH[address_type]
+    if expected_length is None:
+        if len(payload) < 32:
+            return None
+    elif len(payload) != expected_length:
+        return None
+
+    for network, network_hrp in NETWORK_HRP.items():
+        if hrp == network_hrp:
+            if network_id != NETWORK_ID[network]:
+                return None
+            return {"network": network, "type": address_type, "payload": payload}
+    return None
+
+
+def validate_address(address, network):
+    """
+    Prüft, ob eine Adresse eine gültige Zahlungsadresse des Netzwerks ist.
+
+    :param address: Bech32-Adresse
+    :param network: 'testnet' oder 'mainnet'
+    :return: True, wenn die Adresse gültig ist
+    """
+    if not isinstance(address, str):
+        return False
+    decoded = decode_address(address.strip())
+    return decoded is not None and decoded["network"] == network
+
+
+def validate_addresses(addresses, network):
+    """
+    Prüft viele Adressen auf einmal; doppelte Adressen werden nur einmal dekodiert.
+
+    :param addresses: Iterable von Adressen
+    :param network: 'testnet' oder 'mainnet'
+    :return: Dict Adresse -> bool
+    """
+    results = {}
+    for address in addresses:
+        if address not in results:
+            results[address] = validate_address(address, network)
+    return results
@@ -1,109 +1,317 @@
-import os
-import subprocess
-import json
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from blockfrost import BlockFrostApi, ApiError
-from config import BLOCKFROST_PROJECT_ID_TESTNET, BLOCKFROST_PROJECT_ID_MAINNET, DEFAULT_NETWORK
+from cache import LRUCache, CACHE_FRESH, CACHE_STALE
+from protocol_params import ProtocolParametersCache
+from balance import Balance
+from blockfrost_client import RateLimitedApi, get_token_bucket
+from coin_selection import UtxoIndex, InsufficientFunds, TransactionTooLarge
+import cardano_address
+from config import (
+    BLOCKFROST_PROJECT_ID_TESTNET, BLOCKFROST_PROJECT_ID_MAINNET, DEFAULT_NETWORK, BLOCKFROST_MAX_WORKERS,
+    BLOCKFROST_PORTFOLIO_CONCURRENCY, BLOCKFROST_PORTFOLIO_TIMEOUT,
+    BALANCE_CACHE_TTL, BALANCE_CACHE_STALE_TTL, BALANCE_CACHE_MAX_ENTRIES,
+    COIN_SELECTION_STRATEGY, UTXO_CACHE_TTL
+)
+
+SUPPORTED_NETWORKS = ("testnet", "mainnet")
+
+
+class BlockfrostClientPool:
+    """Registry mit genau einem langlebigen, rate-limitierten Blockfrost-Client pro Netzwerk."""
+    
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _project_id(network):
+        """Gibt die Projekt-ID für ein Netzwerk zurück."""
+        if network == "testnet":
+            return BLOCKFROST_PROJECT_ID_TESTNET
+        return BLOCKFROST_PROJECT_ID_MAINNET
+    
+    def get(self, network):
+        """
+        Gibt den Client für ein Netzwerk zurück und erstellt ihn beim ersten Zugriff.
+        
+        :param network: 'testnet' oder 'mainnet'
+        :return: BlockFrostApi-Client oder None, wenn nicht konfiguriert
+        """
+        # Schneller Pfad ohne Lock: Client existiert bereits
+        if network in self._clients:
+            return self._clients[network]
+        
+        with self._lock:
+            if network in self._clients:
+                return self._clients[network]
+            
+            project_id = self._project_id(network)
+            client = None
+            if project_id:
+                try:
+                    # Rate-Limit, Backoff und Zusammenfassen identischer Anfragen
+                    client = RateLimitedApi(
+                        BlockFrostApi(
+                            project_id=project_id,
+                            base_url=f"https://cardano-{network}.blockfrost.io/api/v0"
+                        ),
+                        get_token_bucket(project_id)
+                    )
+                    print(f"Blockfrost-Verbindung hergestellt (Netzwerk: {network})")
+                except Exception as e:
+                    # Fehler nicht zwischenspeichern, damit ein späterer Versuch möglich ist
+                    print(f"Fehler bei der Initialisierung der Blockfrost API: {e}")
+                    return None
+            else:
+                print(f"Blockfrost Projekt-ID für {network} nicht konfiguriert")
+            
+            self._clients[network] = client
+            return client
+    
+    def warm_up(self, networks=SUPPORTED_NETWORKS):
+        """Erstellt die Clients für alle angegebenen Netzwerke vorab."""
+        for network in networks:
+            self.get(network)
+
+
+# Prozessweit geteilte Client-Registry
+_client_pool = BlockfrostClientPool()
+
+
+def get_client_pool():
+    """Gibt die prozessweit geteilte Blockfrost-Client-Registry zurück."""
+    return _client_pool
+
 
 class CardanoTransactionManager:
     def __init__(self, network=None):
+        # Standardnetzwerk, falls ein Aufrufer kein Netzwerk angibt
         self.network = network or DEFAULT_NETWORK
-        self.api = None
-        self.connect_to_network(self.network)
+        self.clients = get_client_pool()
+        # Begrenzter Thread-Pool, damit blockierende Blockfrost-Aufrufe den Event-Loop nicht anhalten
+        self._executor = ThreadPoolExecutor(
+            max_workers=BLOCKFROST_MAX_WORKERS,
+            thread_name_prefix="blockfrost"
+        )
+        # Eigener Pool für die parallelen Vorabprüfungen in send_ada, da send_ada
+        # selbst im Blockfrost-Pool laufen kann
+        self._preflight_executor = ThreadPoolExecutor(
+            max_workers=BLOCKFROST_MAX_WORKERS,
+            thread_name_prefix="blockfrost-preflight"
+        )
+        # Kontostände pro (Netzwerk, Adresse) mit stale-while-revalidate
+        self.balance_cache = LRUCache(
+            max_entries=BALANCE_CACHE_MAX_ENTRIES,
+            ttl=BALANCE_CACHE_TTL,
+            stale_ttl=BALANCE_CACHE_STALE_TTL
+        )
+        # Protokollparameter pro Netzwerk, gültig bis zum Epochenwechsel
+        self.protocol_params = ProtocolParametersCache()
+        # Sortierte UTXO-Mengen pro Adresse für die Coin-Selection
+        self.utxo_index = UtxoIndex(ttl=UTXO_CACHE_TTL)
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        # Clients entstehen beim ersten Aufruf je Netzwerk (BlockfrostClientPool.get)
+    
+    @property
+    def api(self):
+        """Client des Standardnetzwerks (Kompatibilität zu älteren Aufrufern)."""
+        return self.clients.get(self.network)
+    
+    def get_api(self, network=None):
+        """Gibt den Blockfrost-Client für das angegebene Netzwerk zurück."""
+        return self.clients.get(network or self.network)
+    
+    def is_network_available(self, network):
+        """Prüft, ob für ein Netzwerk ein Blockfrost-Client verfügbar ist."""
+        return self.clients.get(network) is not None
     
     def connect_to_network(self, network):
-        """Verbindet mit dem spezifizierten Cardano-Netzwerk."""
-        self.network = network
-        
-        # Entsprechendes Projekt-ID wählen
-        if network == "testnet":
-            project_id = BLOCKFROST_PROJECT_ID_TESTNET
-        else:
-            project_id = BLOCKFROST_PROJECT_ID_MAINNET
+        """
+        Setzt das Standardnetzwerk dieses Managers.
         
-        # Blockfrost API-Client initialisieren
-        if project_id:
-            try:
-                self.api = BlockFrostApi(
-                    project_id=project_id,
-                    base_url=f"https://cardano-{network}.blockfrost.io/api/v0"
-                )
-                print(f"Blockfrost-Verbindung hergestellt (Netzwerk: {network})")
-                return True
-            except Exception as e:
-                print(f"Fehler bei der Initialisierung der Blockfrost API: {e}")
-                self.api = None
-                return False
-        else:
-            print(f"Blockfrost Projekt-ID für {network} nicht konfiguriert")
-            self.api = None
-            return False
+        Der Client wird aus der Registry wiederverwendet, es wird keine neue
+        Verbindung aufgebaut. Neue Aufrufer sollten das Netzwerk stattdessen
+        pro Aufruf übergeben.
+        """
+        self.network = network
+        return self.is_network_available(network)
     
-    def check_wallet_balance(self, wallet_address):
-        """Überprüft den Kontostand einer Wallet-Adresse."""
-        if not self.api:
-            return {"error": "Blockfrost API nicht initialisiert"}
+    def check_wallet_balance(self, wallet_address, network=None, use_cache=True):
+        """
+        Überprüft den Kontostand einer Wallet-Adresse.
+        
+        Frische Einträge kommen aus dem Cache. Veraltete Einträge werden sofort
+        zurückgegeben und im Hintergrund aktualisiert.
+        """
+        network = network or self.network
         
         if not wallet_address:
             return {"error": "Wallet-Adresse nicht angegeben"}
         
+        if use_cache:
+            cached = self._cached_balance(wallet_address, network)
+            if cached:
+                return cached
+        
+        return self._fetch_balance(wallet_address, network)
+    
+    def _cached_balance(self, wallet_address, network):
+        """Gibt einen frischen oder veralteten Cache-Eintrag zurück, sonst None."""
+        cached, state = self.balance_cache.lookup((network, wallet_address))
+        if state == CACHE_FRESH:
+            return dict(cached, cached=True)
+        if state == CACHE_STALE:
+            self._schedule_balance_refresh(wallet_address, network)
+            return dict(cached, cached=True, stale=True)
+        return None
+    
+    def _fetch_balance(self, wallet_address, network):
+        """Fragt den Kontostand bei Blockfrost ab und aktualisiert den Cache."""
+        api = self.get_api(network)
+        if not api:
+            return {"error": "Blockfrost API nicht initialisiert"}
+        
         try:
             # Abrufen der Adressinformationen
-            address_info = self.api.address(wallet_address)
-            
-            # Extrahieren des ADA-Betrags (in Lovelace)
-            lovelace_amount = int(address_info.amount[0].quantity)
+            address_info = api.address(wallet_address)
             
-            # Umrechnung von Lovelace in ADA (1 ADA = 1.000.000 Lovelace)
-            ada_amount = lovelace_amount / 1000000
+            # Lovelace und native Assets aus allen Einträgen übernehmen
+            balance = Balance.from_amounts(address_info.amount)
             
-            return {
+            result = {
                 "success": True,
                 "address": wallet_address,
-                "balance_lovelace": lovelace_amount,
-                "balance_ada": ada_amount,
-                "network": self.network
+                "balance": balance,
+                "balance_lovelace": balance.lovelace,
+                "balance_ada": balance.ada,
+                "network": network
             }
+            self.balance_cache.set((network, wallet_address), result)
+            return result
         except ApiError as e:
             return {"error": f"Blockfrost API-Fehler: {e}"}
         except Exception as e:
             return {"error": f"Unerwarteter Fehler: {e}"}
     
-    def validate_address(self, address):
-        """Validiert, ob eine Cardano-Adresse gültig ist."""
-        if not self.api:
-            return False
+    def _schedule_balance_refresh(self, wallet_address, network):
+        """Aktualisiert einen veralteten Kontostand im Hintergrund (höchstens einmal gleichzeitig)."""
+        key = (network, wallet_address)
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        
+        def refresh():
+            try:
+                self._fetch_balance(wallet_address, network)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+        
+        self._executor.submit(refresh)
+    
+    async def check_wallet_balances_async(self, wallet_addresses, network=None, timeout=BLOCKFROST_PORTFOLIO_TIMEOUT):
+        """
+        Fragt die Kontostände vieler Adressen gleichzeitig ab (Portfolio).
+        
+        Doppelte Adressen werden nur einmal abgefragt, Cache-Treffer ohne
+        Netzwerkaufruf beantwortet und höchstens BLOCKFROST_PORTFOLIO_CONCURRENCY
+        Abfragen laufen parallel. Adressen, die nach ``timeout`` Sekunden noch
+        nicht beantwortet sind, erhalten einen Fehler; laufende Abfragen füllen
+        den Cache trotzdem für den nächsten Aufruf.
         
-        # Validiere auch das Netzwerk (Testnet vs. Mainnet)
-        is_testnet_address = address.startswith('addr_test')
-        if is_testnet_address and self.network != 'testnet':
+        :param wallet_addresses: Iterable von Adressen
+        :param network: 'testnet' oder 'mainnet'
+        :param timeout: Frist für alle Abfragen zusammen in Sekunden
+        :return: Dict Adresse -> Ergebnis wie bei check_wallet_balance
+        """
+        network = network or self.network
+        addresses = list(dict.fromkeys(address for address in wallet_addresses if address))
+        if not addresses:
+            return {}
+        semaphore = asyncio.Semaphore(BLOCKFROST_PORTFOLIO_CONCURRENCY)
+        
+        async def fetch(address):
+            cached = self._cached_balance(address, network)
+            if cached:
+                return cached
+            async with semaphore:
+                return await self._run_blocking(self._fetch_balance, address, network)
+        
+        tasks = {address: asyncio.ensure_future(fetch(address)) for address in addresses}
+        _, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        
+        return {
+            address: task.result() if task not in pending else {"error": "Zeitüberschreitung bei der Abfrage"}
+            for address, task in tasks.items()
+        }
+    
+    def invalidate_balance(self, wallet_address, network=None):
+        """Entfernt den zwischengespeicherten Kontostand einer Adresse."""
+        self.balance_cache.invalidate((network or self.network, wallet_address))
+    
+    def validate_address(self, address, network=None, check_chain=False):
+        """
+        Validiert, ob eine Cardano-Adresse gültig ist.
+        
+        Prüfsumme, Präfix und Netzwerk werden lokal geprüft. Mit ``check_chain``
+        wird zusätzlich bei Blockfrost abgefragt, ob die Adresse bereits
+        on-chain verwendet wurde.
+        """
+        network = network or self.network
+        
+        # Offline-Prüfung (Bech32, addr/addr_test, Netzwerk-Bits im Header)
+        if not cardano_address.validate_address(address, network):
             return False
-        if not is_testnet_address and self.network == 'testnet':
+        
+        if not check_chain:
+            return True
+        
+        api = self.get_api(network)
+        if not api:
             return False
         
         try:
             # Versuche, Adressinformationen abzurufen
-            self.api.address(address)
+            api.address(address)
             return True
         except ApiError:
             return False
         except Exception:
             return False
     
-    def send_ada(self, sender_wallet, recipient_address, amount_ada):
+    def validate_addresses(self, addresses, network=None):
+        """Validiert viele Adressen offline auf einmal und gibt Adresse -> bool zurück."""
+        return cardano_address.validate_addresses(addresses, network or self.network)
+    
+    def send_ada(self, sender_wallet, recipient_address, amount_ada, network=None):
         """
         Sendet ADA an eine angegebene Adresse.
         
         :param sender_wallet: Wallet-Objekt des Senders
         :param recipient_address: Empfänger-Adresse
         :param amount_ada: Zu sendender Betrag in ADA
+        :param network: Netzwerk der Transaktion (Standard: Netzwerk der Wallet)
         :return: Ergebnis der Transaktion
         """
-        if not self.api:
-            return {"error": f"Blockfrost API für {self.network} nicht initialisiert"}
+        if amount_ada <= 0:
+            return {"error": "Der Betrag muss größer als 0 ADA sein"}
         
-        # Überprüfen, ob die Wallet für das aktuelle Netzwerk ist
-        if sender_wallet["network"] != self.network:
-            return {"error": f"Die Wallet ist für {sender_wallet['network']}, aber aktuell ist {self.network} ausgewählt"}
+        network = network or sender_wallet["network"]
+        api = self.get_api(network)
+        if not api:
+            return {"error": f"Blockfrost API für {network} nicht initialisiert"}
+        
+        # Überprüfen, ob die Wallet für das angeforderte Netzwerk ist
+        if sender_wallet["network"] != network:
+            return {"error": f"Die Wallet ist für {sender_wallet['network']}, aber aktuell ist {network} ausgewählt"}
         
         wallet_address = sender_wallet["address"]
         signing_key_path = sender_wallet["payment_skey_path"]
@@ -111,115 +319,176 @@ class CardanoTransactionManager:
         if not wallet_address or not signing_key_path:
             return {"error": "Wallet nicht vollständig konfiguriert"}
         
-        # Adressvalidierung
-        if not self.validate_address(recipient_address):
-            return {"error": "Ungültige Empfängeradresse"}
+        # UTXO-Menge und Protokollparameter sind unabhängig voneinander und
+        # werden parallel abgefragt, während die Adresse lokal geprüft wird
+        started = time.perf_counter()
+        timings = {}
+        
+        def timed(phase, func, *args):
+            phase_started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                timings[phase] = round((time.perf_counter() - phase_started) * 1000, 1)
+        
+        utxo_future = self._preflight_executor.submit(
+            timed, "utxos_ms", self.utxo_index.get, api, network, wallet_address
+        )
+        params_future = self._preflight_executor.submit(
+            timed, "protocol_parameters_ms", self.protocol_params.get, api, network
+        )
+        
+        # Die Adressprüfung läuft offline und braucht keinen eigenen Thread
+        address_valid = timed("validate_address_ms", self.validate_address, recipient_address, network)
+        try:
+            utxos = utxo_future.result()
+        except ApiError as e:
+            utxos = None
+            utxo_error = {"error": f"Blockfrost API-Fehler: {e}"}
+        except Exception as e:
+            utxos = None
+            utxo_error = {"error": f"Unerwarteter Fehler: {e}"}
+        try:
+            protocol_params = params_future.result()
+        except Exception as e:
+            protocol_params = e
+        timings["preflight_ms"] = round((time.perf_counter() - started) * 1000, 1)
         
-        # Kontostand überprüfen
-        balance_info = self.check_wallet_balance(wallet_address)
-        if "error" in balance_info:
-            return balance_info
+        # Adressvalidierung
+        if not address_valid:
+            return {"error": "Ungültige Empfängeradresse", "timings": timings}
         
-        if balance_info["balance_ada"] < amount_ada:
-            return {"error": "Nicht genügend ADA im Wallet"}
+        if utxos is None:
+            return dict(utxo_error, timings=timings)
         
         # Umrechnung in Lovelace
         lovelace_amount = int(amount_ada * 1000000)
         
         try:
             # Blockfrost unterstützt keine direkten Transaktionen, daher verwenden wir die Cardano CLI
-            # Dies ist eine vereinfachte Implementierung - in der Praxis würde man die UTXOs abfragen
-            # und eine vollständige Transaktion erstellen
+            # Dies ist eine vereinfachte Implementierung - in der Praxis würde man die Transaktion
+            # mit den ausgewählten UTXOs bauen, signieren und einreichen
             
-            # 1. Protokollparameter abrufen
-            protocol_params = self.api.epoch_latest_parameters()
+            # 1. Protokollparameter (bereits parallel abgerufen)
+            if isinstance(protocol_params, Exception):
+                raise protocol_params
+            build_started = time.perf_counter()
             
-            # Als temporäre Datei speichern
-            with open("protocol.json", "w") as f:
-                json.dump(protocol_params.to_dict(), f)
-            
-            # 2. Transaktion bauen, signieren und übermitteln mit Cardano CLI
-            # Hinweis: Dies ist eine vereinfachte Darstellung - in der Realität würde man hier
-            # die verschiedenen Schritte der Transaktion mit der CLI ausführen
-            
-            # In einer realen Implementierung würde man hier die entsprechenden
-            # Cardano CLI-Befehle ausführen:
-            # 1. cardano-cli transaction build-raw
-            # 2. cardano-cli transaction calculate-min-fee
-            # 3. cardano-cli transaction build-raw (mit korrekter Fee)
-            # 4. cardano-cli transaction sign
-            # 5. cardano-cli transaction submit
-            
-            # Hier ein Beispiel für eine einfache Transaktion (nicht ausführbar):
-            """
-            # Netzwerkparameter
-            net_param = "--testnet-magic 1097911063" if self.network == "testnet" else "--mainnet"
-            
-            # Transaktion aufbauen
-            tx_build_cmd = [
-                "cardano-cli", "transaction", "build",
-                "--alonzo-era",
-                net_param,
-                "--tx-in", "<UTXO>",
-                "--tx-out", f"{recipient_address}+{lovelace_amount}",
-                "--change-address", wallet_address,
-                "--protocol-params-file", "protocol.json",
-                "--out-file", "tx.raw"
-            ]
-            
-            # Transaktion signieren
-            tx_sign_cmd = [
-                "cardano-cli", "transaction", "sign",
-                net_param,
-                "--tx-body-file", "tx.raw",
-                "--signing-key-file", signing_key_path,
-                "--out-file", "tx.signed"
-            ]
-            
-            # Transaktion einreichen
-            tx_submit_cmd = [
-                "cardano-cli", "transaction", "submit",
-                net_param,
-                "--tx-file", "tx.signed"
-            ]
-            """
-            
-            # Da wir die Transaktionen hier nicht tatsächlich ausführen können,
-            # geben wir nur die Informationen zurück
-            
-            # Wir würden die Befehle mit subprocess ausführen:
-            # subprocess.run(tx_build_cmd, check=True)
-            # subprocess.run(tx_sign_cmd, check=True)
-            # result = subprocess.run(tx_submit_cmd, check=True, capture_output=True, text=True)
-            
-            # Aufräumen
-            if os.path.exists("protocol.json"):
-                os.remove("protocol.json")
+            # 2. Inputs auswählen (Coin-Selection inklusive Gebührenschätzung); die
+            #    gewählten UTXOs bleiben bis zum Ende der Sendung reserviert
+            try:
+                selection = timed(
+                    "selection_ms", self.utxo_index.select,
+                    network, wallet_address, utxos, lovelace_amount, protocol_params, COIN_SELECTION_STRATEGY
+                )
+            except InsufficientFunds:
+                return {"error": "Nicht genügend ADA im Wallet (inklusive Gebühr)", "timings": timings}
+            except TransactionTooLarge:
+                return {
+                    "error": "Der Betrag verteilt sich auf zu viele kleine UTXOs für eine Transaktion. "
+                             "Bitte einen kleineren Betrag senden.",
+                    "timings": timings
+                }
             
-            # Erfolgsmeldung zurückgeben
-            return {
-                "success": True,
-                "message": f"Transaktion erfolgreich: {amount_ada} ADA an {recipient_address} gesendet",
-                "transaction_details": {
-                    "sender": wallet_address,
-                    "recipient": recipient_address,
-                    "amount_ada": amount_ada,
-                    "amount_lovelace": lovelace_amount,
-                    "network": self.network
+            try:
+                # Einmal pro Epoche geschriebene, schreibgeschützte Parameterdatei
+                protocol_file = self.protocol_params.get_file(api, network)
+                
+                # 3. Transaktion bauen, signieren und übermitteln mit Cardano CLI
+                # Hinweis: Dies ist eine vereinfachte Darstellung - in der Realität würde man hier
+                # die verschiedenen Schritte der Transaktion mit der CLI ausführen
+                
+                # In einer realen Implementierung würde man hier die entsprechenden
+                # Cardano CLI-Befehle ausführen:
+                # 1. cardano-cli transaction build-raw
+                # 2. cardano-cli transaction calculate-min-fee
+                # 3. cardano-cli transaction build-raw (mit korrekter Fee)
+                # 4. cardano-cli transaction sign
+                # 5. cardano-cli transaction submit
+                
+                # Hier ein Beispiel für eine einfache Transaktion (nicht ausführbar):
+                """
+                # Netzwerkparameter
+                net_param = "--testnet-magic 1097911063" if network == "testnet" else "--mainnet"
+                
+                # Transaktion aufbauen (ein --tx-in pro ausgewähltem UTXO)
+                tx_in_args = []
+                for utxo in selection.inputs:
+                    tx_in_args += ["--tx-in", utxo.key]
+                tx_build_cmd = [
+                    "cardano-cli", "transaction", "build",
+                    "--alonzo-era",
+                    net_param,
+                    *tx_in_args,
+                    "--tx-out", f"{recipient_address}+{lovelace_amount}",
+                    "--change-address", wallet_address,
+                    "--protocol-params-file", protocol_file,
+                    "--out-file", "tx.raw"
+                ]
+                
+                # Transaktion signieren
+                tx_sign_cmd = [
+                    "cardano-cli", "transaction", "sign",
+                    net_param,
+                    "--tx-body-file", "tx.raw",
+                    "--signing-key-file", signing_key_path,
+                    "--out-file", "tx.signed"
+                ]
+                
+                # Transaktion einreichen
+                tx_submit_cmd = [
+                    "cardano-cli", "transaction", "submit",
+                    net_param,
+                    "--tx-file", "tx.signed"
+                ]
+                """
+                
+                # Da wir die Transaktionen hier nicht tatsächlich ausführen können,
+                # geben wir nur die Informationen zurück
+                
+                # Wir würden die Befehle mit subprocess ausführen:
+                # subprocess.run(tx_build_cmd, check=True)
+                # subprocess.run(tx_sign_cmd, check=True)
+                # result = subprocess.run(tx_submit_cmd, check=True, capture_output=True, text=True)
+                
+                # Der Kontostand des Senders hat sich geändert, die Inputs sind verbraucht
+                self.invalidate_balance(wallet_address, network)
+                self.utxo_index.mark_spent(network, wallet_address, selection.inputs)
+                
+                timings["build_ms"] = round((time.perf_counter() - build_started) * 1000, 1)
+                timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                
+                # Erfolgsmeldung zurückgeben
+                return {
+                    "success": True,
+                    "message": f"Transaktion erfolgreich: {amount_ada} ADA an {recipient_address} gesendet",
+                    "transaction_details": {
+                        "sender": wallet_address,
+                        "recipient": recipient_address,
+                        "amount_ada": amount_ada,
+                        "amount_lovelace": lovelace_amount,
+                        "fee_lovelace": selection.fee,
+                        "network": network
+                    },
+                    "selection": selection.to_dict(),
+                    "timings": timings
                 }
-            }
+            finally:
+                self.utxo_index.release(network, wallet_address, selection.inputs)
             
         except Exception as e:
-            return {"error": f"Fehler bei der Transaktion: {e}"}
+            return {"error": f"Fehler bei der Transaktion: {e}", "timings": timings}
         
-    def get_transaction_status(self, tx_hash):
+    def get_transaction_status(self, tx_hash, network=None):
         """Überprüft den Status einer Transaktion."""
-        if not self.api:
+        network = network or self.network
+        api = self.get_api(network)
+        if not api:
             return {"error": "Blockfrost API nicht initialisiert"}
         
         try:
             # Transaktionsinformationen abrufen
-            transaction = self.api.transaction(tx_hash)
+            transaction = api.transaction(tx_hash)
             
             return {
                 "success": True,
@@ -227,9 +496,40 @@ class CardanoTransactionManager:
                 "block": transaction.block,
                 "block_height": transaction.block_height,
                 "confirmations": transaction.confirmations,
-                "network": self.network
+                "network": network
             }
         except ApiError as e:
             return {"error": f"Blockfrost API-Fehler: {e}"}
         except Exception as e:
-            return {"error": f"Unerwarteter Fehler: {e}"} 
\ No newline at end of file
+            return {"error": f"Unerwarteter Fehler: {e}"} 
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Führt einen blockierenden Aufruf im Blockfrost-Thread-Pool aus."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def check_wallet_balance_async(self, wallet_address, network=None, use_cache=True):
+        """Async-Variante von check_wallet_balance für die Telegram-Handler."""
+        network = network or self.network
+        if not wallet_address:
+            return {"error": "Wallet-Adresse nicht angegeben"}
+        
+        # Cache-Treffer ohne Umweg über den Thread-Pool beantworten
+        if use_cache:
+            cached = self._cached_balance(wallet_address, network)
+            if cached:
+                return cached
+        return await self._run_blocking(self._fetch_balance, wallet_address, network)
+    
+    async def send_ada_async(self, sender_wallet, recipient_address, amount_ada, network=None):
+        """Async-Variante von send_ada für die Telegram-Handler."""
+        return await self._run_blocking(self.send_ada, sender_wallet, recipient_address, amount_ada, network)
+    
+    async def get_transaction_status_async(self, tx_hash, network=None):
+        """Async-Variante von get_transaction_status für die Telegram-Handler."""
+        return await self._run_blocking(self.get_transaction_status, tx_hash, network)
+    
+    def shutdown(self):
+        """Beendet die Thread-Pools für Blockfrost-Aufrufe."""
+        self._executor.shutdown(wait=False)
+        self._preflight_executor.shutdown(wait=False)
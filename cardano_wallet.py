@@ -1,53 +1,247 @@
 import os
 import json
+import sqlite3
 import subprocess
 import random
 import string
+import threading
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
-from config import USER_DATA_DIR
+from config import USER_DATA_DIR, WALLET_INDEX_PATH
+
+
+class WalletIndex:
+    """
+    SQLite-gestützter Wallet-Index mit In-Memory-Abbild.
+    
+    Die Wallets eines (Benutzer, Netzwerk)-Paares werden beim ersten Zugriff mit
+    einer Abfrage geladen; danach sind Lookups nach Name und Standard-Wallet O(1).
+    """
+    
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._lock = threading.RLock()
+        # (user_id, network) -> OrderedDict(name -> wallet_data), in Erstellungsreihenfolge
+        self._wallets = {}
+        
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS wallets ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " user_id TEXT NOT NULL,"
+                " network TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " UNIQUE (user_id, network, name))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            # Abonnierte Zahlungsbenachrichtigungen pro Wallet
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS subscriptions ("
+                " user_id TEXT NOT NULL,"
+                " network TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " address TEXT NOT NULL,"
+                " chat_id INTEGER NOT NULL,"
+                " PRIMARY KEY (user_id, network, name))"
+            )
+            # Zuletzt gesehene Transaktion pro Adresse ("block_height:tx_index")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS address_cursors ("
+                " network TEXT NOT NULL,"
+                " address TEXT NOT NULL,"
+                " cursor TEXT NOT NULL,"
+                " PRIMARY KEY (network, address))"
+            )
+    
+    def _load(self, user_id, network):
+        """Lädt die Wallets eines Benutzers für ein Netzwerk in den Speicher."""
+        key = (str(user_id), network)
+        wallets = self._wallets.get(key)
+        if wallets is not None:
+            return wallets
+        
+        with self._lock:
+            wallets = self._wallets.get(key)
+            if wallets is None:
+                rows = self._conn.execute(
+                    "SELECT name, data FROM wallets WHERE user_id = ? AND network = ? ORDER BY id",
+                    key
+                ).fetchall()
+                wallets = OrderedDict((name, json.loads(data)) for name, data in rows)
+                self._wallets[key] = wallets
+            return wallets
+    
+    def list(self, user_id, network):
+        """Gibt alle Wallets eines Benutzers für ein Netzwerk zurück."""
+        return list(self._load(user_id, network).values())
+    
+    def get(self, user_id, network, name):
+        """Gibt eine Wallet nach Name zurück oder None."""
+        return self._load(user_id, network).get(name)
+    
+    def first(self, user_id, network):
+        """Gibt die zuerst angelegte Wallet zurück oder None."""
+        wallets = self._load(user_id, network)
+        return next(iter(wallets.values()), None)
+    
+    def put(self, user_id, network, wallet_data):
+        """Fügt eine Wallet hinzu oder aktualisiert sie."""
+        name = wallet_data["name"]
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO wallets (user_id, network, name, data) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (user_id, network, name) DO UPDATE SET data = excluded.data",
+                    (str(user_id), network, name, json.dumps(wallet_data))
+                )
+            self._load(user_id, network)[name] = wallet_data
+    
+    def remove(self, user_id, network, name):
+        """Entfernt eine Wallet aus dem Index."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM wallets WHERE user_id = ? AND network = ? AND name = ?",
+                    (str(user_id), network, name)
+                )
+            self._load(user_id, network).pop(name, None)
+    
+    def add_subscription(self, user_id, network, name, address, chat_id):
+        """Speichert ein Abonnement für eine Wallet."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO subscriptions (user_id, network, name, address, chat_id) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (str(user_id), network, name, address, chat_id)
+                )
+    
+    def remove_subscription(self, user_id, network, name):
+        """Entfernt ein Abonnement; gibt True zurück, wenn eines bestand."""
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "DELETE FROM subscriptions WHERE user_id = ? AND network = ? AND name = ?",
+                    (str(user_id), network, name)
+                )
+            return cursor.rowcount > 0
+    
+    def list_subscriptions(self, network):
+        """Gibt alle Abonnements eines Netzwerks als Liste von Dicts zurück."""
+        rows = self._conn.execute(
+            "SELECT user_id, name, address, chat_id FROM subscriptions WHERE network = ?",
+            (network,)
+        ).fetchall()
+        return [
+            {"user_id": user_id, "network": network, "name": name, "address": address, "chat_id": chat_id}
+            for user_id, name, address, chat_id in rows
+        ]
+    
+    def get_cursor(self, network, address):
+        """Gibt den Cursor der zuletzt gesehenen Transaktion einer Adresse zurück oder None."""
+        row = self._conn.execute(
+            "SELECT cursor FROM address_cursors WHERE network = ? AND address = ?",
+            (network, address)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def set_cursor(self, network, address, cursor):
+        """Speichert den Cursor einer Adresse."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO address_cursors (network, address, cursor) VALUES (?, ?, ?)",
+                    (network, address, cursor)
+                )
+    
+    def get_meta(self, key):
+        """Liest einen Metadaten-Eintrag des Index."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def set_meta(self, key, value):
+        """Schreibt einen Metadaten-Eintrag des Index."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+                )
+
 
 class CardanoWalletManager:
     def __init__(self):
-        """Initialisiert den Wallet-Manager und erstellt das Basisverzeichnis."""
+        """Initialisiert den Wallet-Manager, das Basisverzeichnis und den Wallet-Index."""
         self.user_data_dir = Path(USER_DATA_DIR)
         self.user_data_dir.mkdir(parents=True, exist_ok=True)
+        self.index = WalletIndex(WALLET_INDEX_PATH)
+        
+        # Bestehende user_wallets/-Struktur einmalig in den Index übernehmen
+        if not self.index.get_meta("legacy_imported"):
+            imported = self.import_legacy_wallets()
+            self.index.set_meta("legacy_imported", "1")
+            if imported:
+                print(f"{imported} Wallet(s) in den Wallet-Index importiert")
     
     def _get_user_dir(self, user_id):
         """Gibt das Verzeichnis für einen bestimmten Benutzer zurück."""
-        user_dir = self.user_data_dir / str(user_id)
-        user_dir.mkdir(exist_ok=True)
-        return user_dir
+        return self.user_data_dir / str(user_id)
     
     def _get_network_dir(self, user_id, network):
         """Gibt das Verzeichnis für das Netzwerk eines Benutzers zurück."""
-        network_dir = self._get_user_dir(user_id) / network
-        network_dir.mkdir(exist_ok=True)
-        return network_dir
+        return self._get_user_dir(user_id) / network
     
-    def get_user_wallets(self, user_id, network):
+    def import_legacy_wallets(self):
         """
-        Gibt alle Wallets eines Benutzers für ein bestimmtes Netzwerk zurück.
+        Importiert alle *.wallet-Dateien aus USER_DATA_DIR/<user_id>/<network>/ in den Index.
         
-        :param user_id: Telegram-Benutzer-ID
-        :param network: 'testnet' oder 'mainnet'
-        :return: Liste der verfügbaren Wallets
+        Bereits indizierte Wallets werden übersprungen, der Import kann also
+        gefahrlos mehrfach ausgeführt werden.
+        
+        :return: Anzahl der neu importierten Wallets
         """
-        network_dir = self._get_network_dir(user_id, network)
-        wallets = []
+        imported = 0
         
         try:
-            wallet_files = list(network_dir.glob("*.wallet"))
-            for wallet_file in wallet_files:
-                try:
-                    with open(wallet_file, 'r') as f:
-                        wallet_data = json.load(f)
-                        wallets.append(wallet_data)
-                except (json.JSONDecodeError, IOError):
-                    continue
+            wallet_files = sorted(
+                self.user_data_dir.glob("*/*/*.wallet"),
+                key=lambda path: path.stat().st_mtime
+            )
         except Exception as e:
             print(f"Fehler beim Lesen der Wallets: {e}")
+            return imported
         
-        return wallets
+        for wallet_file in wallet_files:
+            network_dir = wallet_file.parent
+            user_id = network_dir.parent.name
+            network = network_dir.name
+            try:
+                with open(wallet_file, 'r') as f:
+                    wallet_data = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                continue
+            
+            wallet_data.setdefault("name", wallet_file.stem)
+            if self.index.get(user_id, network, wallet_data["name"]) is None:
+                self.index.put(user_id, network, wallet_data)
+                imported += 1
+        
+        return imported
+    
+    def get_user_wallets(self, user_id, network):
+        """
+        Gibt alle Wallets eines Benutzers für ein bestimmtes Netzwerk zurück.
+        
+        :param user_id: Telegram-Benutzer-ID
+        :param network: 'testnet' oder 'mainnet'
+        :return: Liste der verfügbaren Wallets
+        """
+        return self.index.list(user_id, network)
     
     def create_wallet(self, user_id, network, wallet_name=None):
         """
@@ -59,6 +253,7 @@ class CardanoWalletManager:
         :return: Wallet-Daten oder Fehler
         """
         network_dir = self._get_network_dir(user_id, network)
+        network_dir.mkdir(parents=True, exist_ok=True)
         
         # Generiere einen zufälligen Namen, wenn keiner angegeben ist
         if not wallet_name:
@@ -133,11 +328,13 @@ class CardanoWalletManager:
                 "payment_skey_path": str(payment_skey),
                 "payment_addr_path": str(payment_addr),
                 "balance": 0,  # Anfangsstand (in Lovelace)
-                "created_at": str(Path.ctime(Path.cwd()))
+                "created_at": datetime.now().isoformat()
             }
             
+            # Die .wallet-Datei bleibt als Sicherung erhalten, gelesen wird aus dem Index
             with open(wallet_file, 'w') as f:
                 json.dump(wallet_data, f, indent=2)
+            self.index.put(user_id, network, wallet_data)
             
             return {
                 "success": True,
@@ -165,18 +362,7 @@ class CardanoWalletManager:
         :param wallet_name: Name der Wallet
         :return: Wallet-Daten oder None, wenn nicht gefunden
         """
-        network_dir = self._get_network_dir(user_id, network)
-        wallet_file = network_dir / f"{wallet_name}.wallet"
-        
-        if not wallet_file.exists():
-            return None
-        
-        try:
-            with open(wallet_file, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Fehler beim Lesen der Wallet {wallet_name}: {e}")
-            return None
+        return self.index.get(user_id, network, wallet_name)
     
     def get_default_wallet(self, user_id, network):
         """
@@ -186,11 +372,11 @@ class CardanoWalletManager:
         :param network: 'testnet' oder 'mainnet'
         :return: Standard-Wallet oder neu erstellte Wallet
         """
-        wallets = self.get_user_wallets(user_id, network)
+        wallet = self.index.first(user_id, network)
         
-        if wallets:
+        if wallet:
             # Verwende die erste Wallet als Standard
-            return wallets[0]
+            return wallet
         else:
             # Erstelle eine neue Wallet, wenn keine existiert
             result = self.create_wallet(user_id, network, "default")
@@ -199,6 +385,46 @@ class CardanoWalletManager:
             else:
                 return None
     
+    def subscribe_wallet(self, user_id, network, wallet_name, chat_id):
+        """
+        Abonniert Zahlungsbenachrichtigungen für eine Wallet.
+        
+        :param user_id: Telegram-Benutzer-ID
+        :param network: 'testnet' oder 'mainnet'
+        :param wallet_name: Name der Wallet
+        :param chat_id: Chat, in den Benachrichtigungen gesendet werden
+        :return: Abonnement oder Fehler
+        """
+        wallet = self.index.get(user_id, network, wallet_name)
+        if not wallet:
+            return {"success": False, "error": f"Wallet {wallet_name} nicht gefunden"}
+        
+        self.index.add_subscription(user_id, network, wallet_name, wallet["address"], chat_id)
+        return {
+            "success": True,
+            "subscription": {
+                "user_id": str(user_id),
+                "network": network,
+                "name": wallet_name,
+                "address": wallet["address"],
+                "chat_id": chat_id
+            }
+        }
+    
+    def unsubscribe_wallet(self, user_id, network, wallet_name):
+        """
+        Beendet die Zahlungsbenachrichtigungen für eine Wallet.
+        
+        :return: Erfolg oder Fehler
+        """
+        if not self.index.remove_subscription(user_id, network, wallet_name):
+            return {"success": False, "error": f"Wallet {wallet_name} ist nicht abonniert"}
+        return {"success": True}
+    
+    def get_subscriptions(self, network):
+        """Gibt alle Abonnements eines Netzwerks zurück."""
+        return self.index.list_subscriptions(network)
+    
     def delete_wallet(self, user_id, network, wallet_name):
         """
         Löscht eine Wallet eines Benutzers.
@@ -211,6 +437,9 @@ class CardanoWalletManager:
         network_dir = self._get_network_dir(user_id, network)
         
         try:
+            self.index.remove(user_id, network, wallet_name)
+            self.index.remove_subscription(user_id, network, wallet_name)
+            
             # Lösche alle Wallet-bezogenen Dateien
             for ext in [".wallet", ".payment.vkey", ".payment.skey", ".payment.addr"]:
                 file_path = network_dir / f"{wallet_name}{ext}"
@@ -0,0 +1,98 @@
+import asyncio
+from blockfrost import ApiError
+from config import TX_WATCH_BLOCK_INTERVAL
+
+# Maximale Anzahl Blöcke, die pro Abfrage nachgeholt werden (Seitengröße von blocks_next)
+MAX_CATCHUP_BLOCKS = 100
+
+
+class BlockFollower:
+    """
+    Verfolgt neue Blöcke pro Netzwerk und verteilt sie an Listener.
+
+    Pro Netzwerk läuft höchstens eine Hintergrund-Task, die einmal pro
+    Blockintervall den neuesten Block abfragt und verpasste Blöcke nachholt.
+    Die Task startet mit dem ersten Listener und endet mit dem letzten, so
+    kostet ein Netzwerk ohne Interessenten keine Anfragen.
+    """
+
+    def __init__(self, cardano_manager, block_interval=TX_WATCH_BLOCK_INTERVAL):
+        self.cardano_manager = cardano_manager
+        self.block_interval = block_interval
+        # network -> Liste von Async-Callbacks (network, blocks)
+        self._listeners = {}
+        # network -> asyncio.Task
+        self._tasks = {}
+        # network -> Hash des zuletzt verarbeiteten Blocks
+        self._last_block = {}
+
+    def add_listener(self, network, listener):
+        """
+        Registriert einen Listener und startet bei Bedarf die Task des Netzwerks.
+
+        Der Listener wird nach jeder Abfrage mit der (eventuell leeren) Liste
+        neuer Blöcke aufgerufen.
+        """
+        listeners = self._listeners.setdefault(network, [])
+        if listener not in listeners:
+            listeners.append(listener)
+        task = self._tasks.get(network)
+        if task is None or task.done():
+            self._tasks[network] = asyncio.get_running_loop().create_task(self._follow(network))
+
+    def remove_listener(self, network, listener):
+        """Entfernt einen Listener; die Task endet nach dem aktuellen Durchlauf."""
+        listeners = self._listeners.get(network, [])
+        if listener in listeners:
+            listeners.remove(listener)
+
+    async def _follow(self, network):
+        """Hintergrund-Task eines Netzwerks."""
+        try:
+            while self._listeners.get(network):
+                try:
+                    blocks = await self._poll(network)
+                except Exception as e:
+                    print(f"Fehler beim Abfragen neuer Blöcke ({network}): {e}")
+                    blocks = []
+                for listener in list(self._listeners.get(network, [])):
+                    try:
+                        await listener(network, blocks)
+                    except Exception as e:
+                        print(f"Fehler bei der Blockverarbeitung ({network}): {e}")
+                if self._listeners.get(network):
+                    await asyncio.sleep(self.block_interval)
+        finally:
+            self._last_block.pop(network, None)
+
+    async def _poll(self, network):
+        """Gibt alle seit der letzten Abfrage hinzugekommenen Blöcke zurück."""
+        api = self.cardano_manager.get_api(network)
+        if not api:
+            return []
+        run = self.cardano_manager._run_blocking
+
+        latest = await run(api.block_latest)
+        last_hash = self._last_block.get(network)
+        if last_hash == latest.hash:
+            return []
+
+        if last_hash is None:
+            # Erster Durchlauf: nur der aktuelle Block
+            blocks = [latest]
+        else:
+            try:
+                blocks = await run(api.blocks_next, last_hash, count=MAX_CATCHUP_BLOCKS)
+            except ApiError:
+                # Letzter Block nicht mehr bekannt (Rollback): beim aktuellen Block neu aufsetzen
+                blocks = [latest]
+        if blocks:
+            self._last_block[network] = blocks[-1].hash
+        return blocks
+
+    def stop(self):
+        """Beendet alle Tasks."""
+        self._listeners.clear()
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
@@ -0,0 +1,365 @@
+import time
+import random
+import threading
+from bisect import bisect_left, insort
+from blockfrost import ApiError
+
+# Seitengröße der Blockfrost-UTXO-Abfrage (Maximum der API)
+UTXO_PAGE_SIZE = 100
+
+# Geschätzte Größen in Bytes für die Gebührenschätzung
+TX_BASE_SIZE = 160
+TX_INPUT_SIZE = 40
+TX_OUTPUT_SIZE = 65
+
+# Wechselgeld unter diesem Betrag ist kein gültiges Output (ca. Min-UTxO einer reinen ADA-Ausgabe)
+MIN_CHANGE_LOVELACE = 1000000
+
+# Maximale Transaktionsgröße in Bytes, falls die Protokollparameter keine enthalten
+DEFAULT_MAX_TX_SIZE = 16384
+
+
+class InsufficientFunds(Exception):
+    """Die verfügbaren UTXOs decken Betrag und Gebühr nicht."""
+
+
+class TransactionTooLarge(Exception):
+    """Betrag und Gebühr lassen sich nur mit mehr Inputs decken, als in eine Transaktion passen."""
+
+
+class Utxo:
+    """Ein unverbrauchter Transaktions-Output."""
+
+    __slots__ = ("tx_hash", "output_index", "lovelace", "assets")
+
+    def __init__(self, tx_hash, output_index, lovelace, assets=None):
+        self.tx_hash = tx_hash
+        self.output_index = output_index
+        self.lovelace = lovelace
+        self.assets = assets or {}
+
+    @property
+    def key(self):
+        """Eindeutige Referenz im Format tx_hash#index."""
+        return f"{self.tx_hash}#{self.output_index}"
+
+    @classmethod
+    def from_blockfrost(cls, utxo):
+        """Erstellt ein Utxo aus einer Blockfrost-Antwort von address_utxos."""
+        lovelace = 0
+        assets = {}
+        for amount in utxo.amount:
+            if amount.unit == "lovelace":
+                lovelace = int(amount.quantity)
+            else:
+                assets[amount.unit] = int(amount.quantity)
+        return cls(utxo.tx_hash, utxo.output_index, lovelace, assets)
+
+
+class UtxoSet:
+    """
+    UTXO-Menge einer Adresse, nach Lovelace sortiert und nach Referenz indiziert.
+
+    Einfügen und Entfernen sind O(log n) für die Suche, die größten UTXOs
+    lassen sich ohne erneutes Sortieren durchlaufen.
+    """
+
+    def __init__(self, utxos=()):
+        self._by_key = {}
+        self._sorted = []
+        self.total_lovelace = 0
+        self.fetched_at = time.monotonic()
+        for utxo in utxos:
+            self.add(utxo)
+
+    def add(self, utxo):
+        """Fügt ein UTXO hinzu."""
+        if utxo.key in self._by_key:
+            return
+        self._by_key[utxo.key] = utxo
+        insort(self._sorted, (utxo.lovelace, utxo.key))
+        self.total_lovelace += utxo.lovelace
+
+    def remove(self, key):
+        """Entfernt ein UTXO anhand seiner Referenz."""
+        utxo = self._by_key.pop(key, None)
+        if utxo is None:
+            return
+        index = bisect_left(self._sorted, (utxo.lovelace, key))
+        del self._sorted[index]
+        self.total_lovelace -= utxo.lovelace
+
+    def without(self, keys):
+        """Gibt eine Kopie ohne die angegebenen Referenzen zurück (z.B. reservierte UTXOs)."""
+        if not keys:
+            return self
+        copy = UtxoSet()
+        copy.fetched_at = self.fetched_at
+        copy._by_key = {key: utxo for key, utxo in self._by_key.items() if key not in keys}
+        copy._sorted = [entry for entry in self._sorted if entry[1] not in keys]
+        copy.total_lovelace = sum(utxo.lovelace for utxo in copy._by_key.values())
+        return copy
+
+    def largest_first(self):
+        """Durchläuft die UTXOs absteigend nach Lovelace (auf einer Momentaufnahme)."""
+        for _, key in self._sorted[::-1]:
+            utxo = self._by_key.get(key)
+            if utxo is not None:
+                yield utxo
+
+    def __iter__(self):
+        return iter(list(self._by_key.values()))
+
+    def __len__(self):
+        return len(self._by_key)
+
+
+def fetch_utxos(api, address):
+    """
+    Lädt alle UTXOs einer Adresse seitenweise von Blockfrost.
+
+    :param api: Blockfrost-Client
+    :param address: Bech32-Adresse
+    :return: UtxoSet (leer, wenn die Adresse noch nie verwendet wurde)
+    """
+    utxos = []
+    page = 1
+    while True:
+        try:
+            batch = api.address_utxos(address, count=UTXO_PAGE_SIZE, page=page)
+        except ApiError as e:
+            # Unbenutzte Adressen liefern 404
+            if getattr(e, "status_code", None) == 404:
+                break
+            raise
+        utxos.extend(Utxo.from_blockfrost(utxo) for utxo in batch)
+        if len(batch) < UTXO_PAGE_SIZE:
+            break
+        page += 1
+    return UtxoSet(utxos)
+
+
+class UtxoIndex:
+    """
+    Zwischenspeicher der UTXO-Mengen pro (Netzwerk, Adresse).
+
+    Nach einer Transaktion werden die verbrauchten Inputs lokal entfernt,
+    sodass die nächste Transaktion die Menge nicht erneut laden muss. Inputs
+    einer laufenden Transaktion sind reserviert, damit gleichzeitige Sendungen
+    derselben Wallet nicht dieselben UTXOs wählen.
+    """
+
+    def __init__(self, ttl=20):
+        self.ttl = ttl
+        self._sets = {}
+        # (Netzwerk, Adresse) -> Referenzen der UTXOs laufender Transaktionen
+        self._reserved = {}
+        self._lock = threading.Lock()
+
+    def get(self, api, network, address, refresh=False):
+        """Gibt die UTXO-Menge einer Adresse zurück und lädt sie bei Bedarf."""
+        key = (network, address)
+        utxo_set = self._sets.get(key)
+        if not refresh and utxo_set is not None and time.monotonic() - utxo_set.fetched_at < self.ttl:
+            return utxo_set
+
+        utxo_set = fetch_utxos(api, address)
+        with self._lock:
+            self._sets[key] = utxo_set
+        return utxo_set
+
+    def select(self, network, address, utxo_set, amount, protocol_params, strategy="random_improve"):
+        """
+        Führt die Coin-Selection ohne reservierte UTXOs aus und reserviert die gewählten Inputs.
+
+        Die Reservierung muss nach dem Senden (oder bei einem Fehler) mit
+        ``release`` aufgehoben werden.
+        """
+        key = (network, address)
+        with self._lock:
+            reserved = self._reserved.setdefault(key, set())
+            selection = select_coins(utxo_set.without(reserved), amount, protocol_params, strategy)
+            reserved.update(utxo.key for utxo in selection.inputs)
+        return selection
+
+    def release(self, network, address, utxos):
+        """Hebt die Reservierung von UTXOs auf."""
+        key = (network, address)
+        with self._lock:
+            reserved = self._reserved.get(key)
+            if reserved is None:
+                return
+            reserved.difference_update(utxo.key for utxo in utxos)
+            if not reserved:
+                del self._reserved[key]
+
+    def mark_spent(self, network, address, utxos):
+        """Entfernt verbrauchte UTXOs aus der zwischengespeicherten Menge."""
+        utxo_set = self._sets.get((network, address))
+        if utxo_set is None:
+            return
+        with self._lock:
+            for utxo in utxos:
+                utxo_set.remove(utxo.key)
+
+    def invalidate(self, network, address):
+        """Verwirft die UTXO-Menge einer Adresse."""
+        with self._lock:
+            self._sets.pop((network, address), None)
+
+
+def estimate_fee(protocol_params, input_count, output_count):
+    """
+    Schätzt die Transaktionsgebühr aus den Protokollparametern.
+
+    :param protocol_params: Dict mit min_fee_a und min_fee_b
+    :return: Gebühr in Lovelace
+    """
+    size = TX_BASE_SIZE + TX_INPUT_SIZE * input_count + TX_OUTPUT_SIZE * output_count
+    return int(protocol_params["min_fee_a"]) * size + int(protocol_params["min_fee_b"])
+
+
+def max_inputs(protocol_params):
+    """Höchstzahl an Inputs, mit der eine Transaktion (zwei Outputs) unter max_tx_size bleibt."""
+    max_tx_size = int(protocol_params.get("max_tx_size") or DEFAULT_MAX_TX_SIZE)
+    return max(1, (max_tx_size - TX_BASE_SIZE - 2 * TX_OUTPUT_SIZE) // TX_INPUT_SIZE)
+
+
+class Selection:
+    """Ergebnis einer Coin-Selection."""
+
+    __slots__ = ("inputs", "amount", "fee", "change", "strategy")
+
+    def __init__(self, inputs, amount, fee, change, strategy):
+        self.inputs = inputs
+        self.amount = amount
+        self.fee = fee
+        self.change = change
+        self.strategy = strategy
+
+    def to_dict(self):
+        return {
+            "inputs": [utxo.key for utxo in self.inputs],
+            "amount_lovelace": self.amount,
+            "fee_lovelace": self.fee,
+            "change_lovelace": self.change,
+            "strategy": self.strategy
+        }
+
+
+def _finalize(selected, remaining, amount, protocol_params, strategy):
+    """
+    Ergänzt die Auswahl, bis Betrag, Gebühr und ein gültiges Wechselgeld gedeckt sind.
+
+    :param selected: Bereits gewählte UTXOs
+    :param remaining: Iterator über weitere Kandidaten (größte zuerst)
+    :raises TransactionTooLarge: wenn dafür mehr als max_inputs Inputs nötig wären
+    """
+    limit = max_inputs(protocol_params)
+    if len(selected) > limit:
+        raise TransactionTooLarge()
+    total = sum(utxo.lovelace for utxo in selected)
+    while True:
+        fee = estimate_fee(protocol_params, len(selected), 2)
+        change = total - amount - fee
+        if change >= MIN_CHANGE_LOVELACE:
+            return Selection(selected, amount, fee, change, strategy)
+
+        # Lieber einen weiteren Input nehmen als Wechselgeld verlieren
+        candidate = next(remaining, None)
+        if candidate is None:
+            # Ohne Wechselgeld-Output geht ein zu kleiner Rest in die Gebühr
+            if total - amount - estimate_fee(protocol_params, len(selected), 1) >= 0:
+                return Selection(selected, amount, total - amount, 0, strategy)
+            raise InsufficientFunds()
+        if len(selected) >= limit:
+            raise TransactionTooLarge()
+        selected.append(candidate)
+        total += candidate.lovelace
+
+
+def select_largest_first(utxo_set, amount, protocol_params):
+    """
+    Wählt die größten UTXOs, bis Betrag und Gebühr gedeckt sind.
+
+    :param utxo_set: UtxoSet der Sender-Adresse
+    :param amount: Zu sendender Betrag in Lovelace
+    :param protocol_params: Protokollparameter für die Gebührenschätzung
+    :return: Selection
+    :raises InsufficientFunds: wenn die UTXOs nicht ausreichen
+    :raises TransactionTooLarge: wenn selbst die größten UTXOs nicht in eine Transaktion passen
+    """
+    limit = max_inputs(protocol_params)
+    candidates = utxo_set.largest_first()
+    selected = []
+    total = 0
+    for utxo in candidates:
+        if len(selected) >= limit:
+            # Die größten UTXOs reichen nicht: zu groß, oder insgesamt zu wenig Guthaben
+            if utxo_set.total_lovelace < amount:
+                raise InsufficientFunds()
+            raise TransactionTooLarge()
+        selected.append(utxo)
+        total += utxo.lovelace
+        if total >= amount + estimate_fee(protocol_params, len(selected), 2):
+            break
+    return _finalize(selected, candidates, amount, protocol_params, "largest_first")
+
+
+def select_random_improve(utxo_set, amount, protocol_params, rng=None):
+    """
+    Random-Improve nach CIP-2: zufällige Auswahl bis zum Betrag, dann Verbesserung
+    Richtung des doppelten Betrags (höchstens dreifach), damit das Wechselgeld
+    ähnlich groß wie die Zahlung wird und die UTXO-Menge gesund bleibt.
+
+    Schlägt die zufällige Phase fehl, wird auf Largest-First zurückgegriffen.
+    """
+    rng = rng or random.Random()
+    limit = max_inputs(protocol_params)
+    pool = list(utxo_set)
+    rng.shuffle(pool)
+
+    # Phase 1: zufällig auswählen, bis der Betrag gedeckt ist (höchstens ``limit`` Inputs)
+    selected = []
+    total = 0
+    while total < amount and pool and len(selected) < limit:
+        utxo = pool.pop()
+        selected.append(utxo)
+        total += utxo.lovelace
+    if total < amount:
+        return select_largest_first(utxo_set, amount, protocol_params)
+
+    # Phase 2: verbessern, solange die Summe näher an das Ideal rückt
+    ideal = 2 * amount
+    maximum = 3 * amount
+    for utxo in pool[::-1]:
+        if total >= ideal or len(selected) >= limit:
+            break
+        new_total = total + utxo.lovelace
+        if new_total <= maximum and abs(ideal - new_total) < abs(ideal - total):
+            selected.append(utxo)
+            total = new_total
+
+    chosen = {utxo.key for utxo in selected}
+    remaining = (utxo for utxo in utxo_set.largest_first() if utxo.key not in chosen)
+    try:
+        return _finalize(selected, remaining, amount, protocol_params, "random_improve")
+    except (InsufficientFunds, TransactionTooLarge):
+        return select_largest_first(utxo_set, amount, protocol_params)
+
+
+STRATEGIES = {
+    "largest_first": select_largest_first,
+    "random_improve": select_random_improve,
+}
+
+
+def select_coins(utxo_set, amount, protocol_params, strategy="random_improve"):
+    """
+    Führt die Coin-Selection mit der angegebenen Strategie aus.
+
+    :raises ValueError: wenn der Betrag nicht positiv ist
+    """
+    if amount <= 0:
+        raise ValueError(f"Betrag muss positiv sein: {amount} Lovelace")
+    return STRATEGIES.get(strategy, select_random_improve)(utxo_set, amount, protocol_params)
@@ -6,24 +6,108 @@ load_dotenv()
 
 # OpenAI API-Konfiguration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Ab dieser Konfidenz beantwortet der lokale Klassifikator ohne GPT-4-Aufruf
+INTENT_LOCAL_CONFIDENCE = float(os.getenv("INTENT_LOCAL_CONFIDENCE", "0.8"))
+# Cache für GPT-Intent-Ergebnisse (leerer Pfad = nur im Speicher)
+INTENT_CACHE_PATH = os.getenv("INTENT_CACHE_PATH", "intent_cache.json")
+INTENT_CACHE_TTL = float(os.getenv("INTENT_CACHE_TTL", str(7 * 24 * 3600)))
+INTENT_CACHE_MAX_ENTRIES = int(os.getenv("INTENT_CACHE_MAX_ENTRIES", "5000"))
 
 # Blockfrost API-Konfiguration
 BLOCKFROST_PROJECT_ID_TESTNET = os.getenv("BLOCKFROST_PROJECT_ID_TESTNET")
 BLOCKFROST_PROJECT_ID_MAINNET = os.getenv("BLOCKFROST_PROJECT_ID_MAINNET")
 DEFAULT_NETWORK = os.getenv("DEFAULT_NETWORK", "testnet")  # Default: testnet
+# Maximale Anzahl paralleler Blockfrost-Anfragen (Thread-Pool für die async Handler)
+BLOCKFROST_MAX_WORKERS = int(os.getenv("BLOCKFROST_MAX_WORKERS", "16"))
+# Client-seitiges Rate-Limit pro Projekt-ID (Blockfrost: 10 Anfragen/s, Burst 500)
+BLOCKFROST_RATE_LIMIT = float(os.getenv("BLOCKFROST_RATE_LIMIT", "10"))
+BLOCKFROST_BURST = int(os.getenv("BLOCKFROST_BURST", "500"))
+# Wiederholungen bei 429/5xx mit exponentiellem Backoff (Sekunden)
+BLOCKFROST_MAX_RETRIES = int(os.getenv("BLOCKFROST_MAX_RETRIES", "5"))
+BLOCKFROST_BACKOFF_BASE = float(os.getenv("BLOCKFROST_BACKOFF_BASE", "0.5"))
+BLOCKFROST_BACKOFF_MAX = float(os.getenv("BLOCKFROST_BACKOFF_MAX", "30"))
+# Maximale Anzahl gleichzeitiger Abfragen bei Sammel-Kontoständen (/wallet)
+BLOCKFROST_PORTFOLIO_CONCURRENCY = int(os.getenv("BLOCKFROST_PORTFOLIO_CONCURRENCY", "8"))
+# Frist für Sammel-Kontostände in Sekunden; langsamere Adressen werden als Fehler angezeigt
+BLOCKFROST_PORTFOLIO_TIMEOUT = float(os.getenv("BLOCKFROST_PORTFOLIO_TIMEOUT", "5"))
+
+# Kontostand-Cache (Sekunden; ein Block dauert ca. 20 Sekunden)
+BALANCE_CACHE_TTL = float(os.getenv("BALANCE_CACHE_TTL", "20"))
+BALANCE_CACHE_STALE_TTL = float(os.getenv("BALANCE_CACHE_STALE_TTL", "120"))
+BALANCE_CACHE_MAX_ENTRIES = int(os.getenv("BALANCE_CACHE_MAX_ENTRIES", "10000"))
+
+# Bestätigungs-Überwachung: Abfrageintervall (ca. ein Block) und maximale Wartezeit in Sekunden
+TX_WATCH_BLOCK_INTERVAL = float(os.getenv("TX_WATCH_BLOCK_INTERVAL", "20"))
+TX_WATCH_TIMEOUT = float(os.getenv("TX_WATCH_TIMEOUT", "3600"))
+# Worker für die Überwachung abonnierter Wallet-Adressen
+ADDRESS_WATCH_WORKERS = int(os.getenv("ADDRESS_WATCH_WORKERS", "4"))
+
+# Coin-Selection: "random_improve" (CIP-2) oder "largest_first"
+COIN_SELECTION_STRATEGY = os.getenv("COIN_SELECTION_STRATEGY", "random_improve")
+UTXO_CACHE_TTL = float(os.getenv("UTXO_CACHE_TTL", "20"))
 
 # Basispfad für Benutzerdaten (Wallets)
 USER_DATA_DIR = os.getenv("USER_DATA_DIR", "user_wallets")
+# SQLite-Index aller Wallets (Standard: innerhalb von USER_DATA_DIR)
+WALLET_INDEX_PATH = os.getenv("WALLET_INDEX_PATH", os.path.join(USER_DATA_DIR, "wallets.db"))
+# Benutzerzustand: Einstellungen in SQLite (leerer Pfad = nur im Speicher),
+# offene Bestätigungen verfallen nach PENDING_TX_TTL Sekunden
+USER_STATE_PATH = os.getenv("USER_STATE_PATH", os.path.join(USER_DATA_DIR, "user_state.db"))
+USER_STATE_MAX_ENTRIES = int(os.getenv("USER_STATE_MAX_ENTRIES", "10000"))
+PENDING_TX_TTL = float(os.getenv("PENDING_TX_TTL", "300"))
 
 # Audio-Konfiguration
 AUDIO_RECORDING_TIMEOUT = 5  # Sekunden
 AUDIO_SAMPLE_RATE = 44100
 AUDIO_CHANNELS = 1
+# Sprachaktivitätserkennung (VAD): Aufnahme endet nach Sprechpause, spätestens nach dem Maximum
+AUDIO_VAD_ENABLED = os.getenv("AUDIO_VAD_ENABLED", "true").lower() == "true"
+AUDIO_VAD_FRAME_MS = 30
+AUDIO_VAD_SILENCE_MS = int(os.getenv("AUDIO_VAD_SILENCE_MS", "600"))
+AUDIO_VAD_PREROLL_MS = 300
+AUDIO_MAX_RECORDING_SECONDS = float(os.getenv("AUDIO_MAX_RECORDING_SECONDS", "15"))
+# Sprachnachrichten bis zu dieser Größe werden im Speicher verarbeitet, größere über eine Temp-Datei
+VOICE_MEMORY_LIMIT_BYTES = int(os.getenv("VOICE_MEMORY_LIMIT_BYTES", str(5 * 1024 * 1024)))
+# Vorverarbeitung vor der Transkription (Stille kürzen, 16 kHz mono, Opus)
+AUDIO_PREPROCESS_ENABLED = os.getenv("AUDIO_PREPROCESS_ENABLED", "true").lower() == "true"
+AUDIO_PREPROCESS_SAMPLE_RATE = 16000
+AUDIO_SILENCE_THRESHOLD_DB = float(os.getenv("AUDIO_SILENCE_THRESHOLD_DB", "-40"))
+AUDIO_SILENCE_PADDING_MS = 200
+# Spracherkennung: "openai" (Whisper-API) oder "local" (faster-whisper auf der CPU)
+STT_BACKEND = os.getenv("STT_BACKEND", "openai")
+STT_LOCAL_MODEL = os.getenv("STT_LOCAL_MODEL", "base")
+STT_LOCAL_COMPUTE_TYPE = os.getenv("STT_LOCAL_COMPUTE_TYPE", "int8")
+STT_CPU_THREADS = int(os.getenv("STT_CPU_THREADS", "0"))  # 0 = automatisch
+STT_LANGUAGE = os.getenv("STT_LANGUAGE", "de")
+# Transkriptions-Warteschlange: parallele Worker, Gesamtgröße und Limit pro Benutzer
+TRANSCRIPTION_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", "2"))
+TRANSCRIPTION_QUEUE_SIZE = int(os.getenv("TRANSCRIPTION_QUEUE_SIZE", "50"))
+TRANSCRIPTION_MAX_PER_USER = int(os.getenv("TRANSCRIPTION_MAX_PER_USER", "3"))
+
+# Maximale Anzahl gleichzeitig laufender Nachrichten-Handler (pro Benutzer immer nacheinander)
+UPDATE_MAX_CONCURRENCY = int(os.getenv("UPDATE_MAX_CONCURRENCY", "8"))
 
 # Text-to-Speech Konfiguration
 TTS_ENABLED = True
 TTS_RATE = 150  # Sprechgeschwindigkeit
+# Antworten auf Sprachnachrichten zusätzlich als Sprachnachricht senden
+TTS_VOICE_REPLIES = os.getenv("TTS_VOICE_REPLIES", "true").lower() == "true"
+# Cache gerenderter Sätze: Einträge im Speicher, Dateien auf der Festplatte (leerer Pfad = nur Speicher)
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+TTS_CACHE_MAX_ENTRIES = int(os.getenv("TTS_CACHE_MAX_ENTRIES", "200"))
+TTS_CACHE_MAX_FILES = int(os.getenv("TTS_CACHE_MAX_FILES", "2000"))
 
 # Telegram Bot Konfiguration
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+# Webhook-Modus statt Polling, wenn eine öffentliche URL gesetzt ist
+TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL")
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+# Maximale Anzahl eingegangener, noch nicht verarbeiteter Updates
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))
+# Mehrprozessbetrieb (nur mit Webhook): Anzahl der Worker-Prozesse und Queue-Größe je Worker
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", "1"))
+SHARD_QUEUE_SIZE = int(os.getenv("SHARD_QUEUE_SIZE", "1000"))
 AUTHORIZED_USERS = [int(id.strip()) for id in os.getenv("AUTHORIZED_USERS", "").split(",") if id.strip()] 
\ No newline at end of file
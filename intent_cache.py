@@ -0,0 +1,176 @@
+import os
+import re
+import json
+import time
+import atexit
+import threading
+from cache import LRUCache
+
+# Platzhalter-Muster für die Normalisierung (Adressen vor Zahlen ersetzen)
+_ADDRESS_RE = re.compile(r'\baddr(?:_test)?1[02-9ac-hj-np-z]+\b|\b[a-z0-9]{30,}\b')
+# Keine Ziffern innerhalb von Wörtern oder bereits gesetzten Platzhaltern (<addr0>)
+_NUMBER_RE = re.compile(r'(?<![<\w])\d+(?:[.,]\d+)?')
+_WHITESPACE_RE = re.compile(r'\s+')
+_PLACEHOLDER_RE = re.compile(r'^<(num|addr)(\d+)>$')
+_NUMERIC_RE = re.compile(r'^\s*\d+(?:[.,]\d+)?\s*$')
+
+# Entitäten, die immer aus der Eingabe stammen müssen und nie fest gespeichert werden
+_REQUIRED_PLACEHOLDERS = ('amount', 'recipient_address')
+
+
+def normalize_text(text):
+    """
+    Normalisiert eine Eingabe zu einer Vorlage mit Platzhaltern.
+
+    "Sende 5 ADA an addr_test1... statt addr_test1..." wird zu
+    "sende <num0> ada an <addr0> statt <addr1>"; Ziffern in den
+    Adress-Platzhaltern zählen nicht als Zahlen.
+
+    :param text: Benutzereingabe
+    :return: Tupel aus Vorlage und Liste der ersetzten Werte je Platzhaltertyp
+    """
+    text = _WHITESPACE_RE.sub(' ', text.lower()).strip()
+    values = {'addr': [], 'num': []}
+
+    def replace(kind):
+        def _replace(match):
+            values[kind].append(match.group(0))
+            return f"<{kind}{len(values[kind]) - 1}>"
+        return _replace
+
+    template = _ADDRESS_RE.sub(replace('addr'), text)
+    template = _NUMBER_RE.sub(replace('num'), template)
+    return template, values
+
+
+def _parse_number(raw):
+    """Wandelt eine Zahl aus dem Text (auch mit Dezimalkomma) in float um."""
+    return float(raw.replace(',', '.'))
+
+
+class IntentCache:
+    """
+    Begrenzter LRU/TTL-Cache für LLM-Intent-Ergebnisse mit normalisierten Schlüsseln.
+
+    Entitäten, die einem Platzhalter entsprechen, werden als Vorlage gespeichert
+    und bei einem Treffer mit den Werten der neuen Eingabe befüllt.
+    """
+
+    # Nach so vielen neuen Einträgen wird der Cache auf die Platte geschrieben
+    SAVE_EVERY = 10
+
+    def __init__(self, path=None, max_entries=5000, ttl=7 * 24 * 3600):
+        self.path = path
+        self._cache = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._lock = threading.Lock()
+        self._unsaved = 0
+
+        if self.path:
+            self.load()
+            atexit.register(self.save)
+
+    def _to_template(self, result, values):
+        """
+        Ersetzt Entitätswerte, die aus der Eingabe stammen, durch Platzhalter.
+
+        :return: Vorlage oder None, wenn Betrag oder Empfänger nicht als
+                 Platzhalter darstellbar sind (z.B. "fünf")
+        """
+        entities = {}
+        for name, value in (result.get('entities') or {}).items():
+            entities[name] = value
+            if isinstance(value, str) and _NUMERIC_RE.match(value):
+                # Das LLM liefert Beträge teils als Zeichenkette ("5")
+                value = _parse_number(value.strip())
+            if isinstance(value, str):
+                lowered = value.lower()
+                for index, raw in enumerate(values['addr']):
+                    if lowered == raw:
+                        entities[name] = f"<addr{index}>"
+                        break
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                for index, raw in enumerate(values['num']):
+                    if _parse_number(raw) == value:
+                        entities[name] = f"<num{index}>"
+                        break
+            if name in _REQUIRED_PLACEHOLDERS and entities[name] is not None \
+                    and not _PLACEHOLDER_RE.match(str(entities[name])):
+                return None
+        return dict(result, entities=entities)
+
+    def _from_template(self, template_result, values):
+        """Setzt die Werte der aktuellen Eingabe in die gespeicherte Vorlage ein."""
+        entities = {}
+        for name, value in (template_result.get('entities') or {}).items():
+            match = _PLACEHOLDER_RE.match(value) if isinstance(value, str) else None
+            if match:
+                kind, index = match.group(1), int(match.group(2))
+                if index >= len(values[kind]):
+                    return None
+                raw = values[kind][index]
+                value = _parse_number(raw) if kind == 'num' else raw
+            entities[name] = value
+        return dict(template_result, entities=entities)
+
+    def get(self, text):
+        """Gibt ein zwischengespeichertes Ergebnis für die Eingabe zurück oder None."""
+        template, values = normalize_text(text)
+        cached = self._cache.get(template)
+        if cached is None:
+            return None
+        return self._from_template(cached, values)
+
+    def put(self, text, result):
+        """Speichert ein LLM-Ergebnis unter der normalisierten Vorlage."""
+        template, values = normalize_text(text)
+        template_result = self._to_template(result, values)
+        if template_result is None:
+            return
+        self._cache.set(template, template_result)
+
+        with self._lock:
+            self._unsaved += 1
+            should_save = self.path and self._unsaved >= self.SAVE_EVERY
+        if should_save:
+            self.save()
+
+    def load(self):
+        """Lädt den Cache von der Platte, falls vorhanden."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            elapsed = max(time.time() - data.get("saved_at", 0), 0)
+            self._cache.restore(
+                (entry["template"], entry["result"], entry["age"] + elapsed)
+                for entry in data.get("entries", [])
+            )
+        except (json.JSONDecodeError, IOError, KeyError, TypeError) as e:
+            print(f"Fehler beim Laden des Intent-Caches: {e}")
+
+    def save(self):
+        """Schreibt den Cache atomar auf die Platte."""
+        if not self.path:
+            return
+        with self._lock:
+            self._unsaved = 0
+            data = {
+                "saved_at": time.time(),
+                "entries": [
+                    {"template": template, "result": result, "age": age}
+                    for template, result, age in self._cache.export()
+                ]
+            }
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except IOError as e:
+                print(f"Fehler beim Speichern des Intent-Caches: {e}")
+
+    def stats(self):
+        """Gibt Treffer- und Fehltreffer-Zähler des Caches zurück."""
+        stats = self._cache.stats()
+        return {"entries": stats["entries"], "hits": stats["hits"], "misses": stats["misses"]}
@@ -1,12 +1,133 @@
 import re
-import openai
-from config import OPENAI_API_KEY
+import time
+from intent_cache import IntentCache
+from config import (
+    OPENAI_API_KEY, INTENT_LOCAL_CONFIDENCE,
+    INTENT_CACHE_PATH, INTENT_CACHE_TTL, INTENT_CACHE_MAX_ENTRIES
+)
+
+# Vorkompilierte Muster für den lokalen Klassifikator
+# Betrag vor "ADA"/"₳" oder nach "₳"; Ziffernfolgen nur vollständig (nicht "000,50" aus "2.000,50")
+_AMOUNT_RE = re.compile(r'(?<![\d.,])(\d+(?:[.,]\d+)*)\s*(?:ada\b|₳)|₳\s*(\d+(?:[.,]\d+)*)')
+# Eindeutig lesbare Beträge: ganze Zahl oder ein Dezimaltrennzeichen
+_PLAIN_AMOUNT_RE = re.compile(r'\d+(?:[.,]\d+)?')
+# Tausenderpunkte ("1.000", "2.000,50") sind als Dezimalzahl nicht eindeutig
+_GROUPED_AMOUNT_RE = re.compile(r'\d{1,3}(?:\.\d{3})+(?:,\d+)?')
+_NEGATION_RE = re.compile(r'\b(nicht|kein|keine|keinen)\b')
+_ADDRESS_RE = re.compile(r'\b(addr(?:_test)?1[02-9ac-hj-np-z]{20,})\b')
+_SEND_RE = re.compile(r'\b(sende|senden|schicke|schicken|überweise|überweisen|transfer|transferiere|übertrage|zahle|bezahle)\b')
+_BALANCE_STRONG_RE = re.compile(r'\b(kontostand|guthaben|balance|bestand)\b')
+_BALANCE_QUESTION_RE = re.compile(r'\b(wie\s*viel|welchen\s+betrag|was\s+habe\s+ich)\b')
+_ADA_RE = re.compile(r'\bada\b')
+_HELP_RE = re.compile(r'\b(hilfe|helfen|befehle|kommandos)\b|was\s+kannst\s+du')
+_WORD_RE = re.compile(r'\w+')
+
+
+class LocalIntentClassifier:
+    """
+    Regelbasierter Intent-Klassifikator mit Konfidenzwert.
+    
+    Eindeutige Befehle werden lokal ohne Netzwerkaufruf erkannt; mehrdeutige
+    Eingaben erhalten eine niedrige Konfidenz und werden an das LLM weitergereicht.
+    """
+    
+    def __init__(self, ambiguous_confidence=INTENT_LOCAL_CONFIDENCE / 2):
+        # Obergrenze der Konfidenz für Sendebefehle, die lokal nicht sicher lesbar sind
+        self.ambiguous_confidence = ambiguous_confidence
+    
+    def extract_entities(self, text):
+        """
+        Extrahiert Betrag und Empfängeradresse aus dem (kleingeschriebenen) Text.
+        
+        :return: Tupel aus Entitäten und ob die Angaben mehrdeutig sind (mehrere
+                 Beträge oder Adressen, Betrag mit Tausenderpunkten o.ä.)
+        """
+        entities = {}
+        ambiguous = False
+        
+        amounts = [prefix or suffix for prefix, suffix in _AMOUNT_RE.findall(text)]
+        if amounts:
+            raw = amounts[0]
+            if _PLAIN_AMOUNT_RE.fullmatch(raw) and not _GROUPED_AMOUNT_RE.fullmatch(raw):
+                entities['amount'] = float(raw.replace(',', '.'))
+            else:
+                ambiguous = True
+        
+        addresses = _ADDRESS_RE.findall(text)
+        if addresses:
+            entities['recipient_address'] = addresses[0]
+        
+        ambiguous = ambiguous or len(amounts) > 1 or len(set(addresses)) > 1
+        return entities, ambiguous
+    
+    def classify(self, text):
+        """
+        Klassifiziert den Text und gibt Intent, Entitäten und Konfidenz zurück.
+        
+        :param text: Benutzereingabe (Text oder Transkript)
+        :return: Dict mit 'intent', 'entities' und 'confidence' (0.0 - 1.0)
+        """
+        text = text.lower().strip()
+        entities, ambiguous = self.extract_entities(text)
+        scores = {}
+        
+        # ADA senden: Verb, Betrag und Adresse machen den Befehl eindeutig
+        if _SEND_RE.search(text):
+            score = 0.4
+            if 'amount' in entities:
+                score += 0.25
+            if 'recipient_address' in entities:
+                score += 0.3
+            scores['send_ada'] = score
+        
+        # Kontostand: Schlüsselwort allein ist eindeutig, Frage nur zusammen mit "ADA"
+        has_ada = bool(_ADA_RE.search(text))
+        if _BALANCE_STRONG_RE.search(text):
+            scores['check_balance'] = 0.9
+        elif _BALANCE_QUESTION_RE.search(text) and has_ada:
+            scores['check_balance'] = 0.85
+        
+        # Hilfe: nur bei kurzen Eingaben eindeutig
+        if _HELP_RE.search(text):
+            scores['help'] = 0.9 if len(_WORD_RE.findall(text)) <= 6 else 0.6
+        
+        if not scores:
+            return {'intent': 'unknown', 'entities': {}, 'confidence': 0.0}
+        
+        intent = max(scores, key=scores.get)
+        confidence = scores[intent]
+        
+        # Mehrere konkurrierende Intents senken die Konfidenz
+        if len(scores) > 1:
+            runner_up = sorted(scores.values())[-2]
+            confidence -= runner_up / 2
+        
+        if intent != 'send_ada':
+            entities = {}
+        elif ambiguous or _NEGATION_RE.search(text):
+            # "Sende 5 ADA an X, nein 10 ADA", "1.000 ADA", "sende nicht ...": dem LLM überlassen
+            confidence = min(confidence, self.ambiguous_confidence)
+        
+        return {
+            'intent': intent,
+            'entities': entities,
+            'confidence': round(max(confidence, 0.0), 2)
+        }
 
-# OpenAI API-Key setzen
-openai.api_key = OPENAI_API_KEY
 
 class IntentParser:
-    def __init__(self):
+    def __init__(self, local_confidence=INTENT_LOCAL_CONFIDENCE):
+        self.local_classifier = LocalIntentClassifier(ambiguous_confidence=local_confidence / 2)
+        self.local_confidence = local_confidence
+        # Zähler, welcher Pfad wie viele Nachrichten beantwortet hat
+        self.path_counts = {'local': 0, 'openai': 0, 'regex': 0}
+        # Wiederholte Formulierungen ohne erneuten LLM-Aufruf beantworten
+        self.cache = IntentCache(
+            path=INTENT_CACHE_PATH or None,
+            max_entries=INTENT_CACHE_MAX_ENTRIES,
+            ttl=INTENT_CACHE_TTL
+        )
+        
         # Reguläre Ausdrücke für einfache Intent-Erkennung
         self.patterns = {
             'send_ada': r'sende|schicke|überweise|transfer|übertrage|transferiere.*\b(\d+(?:\.\d+)?)\s*ada\b.*\ban\b.*\b([a-zA-Z0-9]+)',
@@ -54,7 +175,14 @@ class IntentParser:
     
     def parse_with_openai(self, text):
         """Nutzt OpenAI, um Intents und Entitäten zu extrahieren."""
+        cached = self.cache.get(text)
+        if cached is not None:
+            return cached
+        
         try:
+            # OpenAI-SDK erst beim ersten GPT-Aufruf laden
+            import openai
+            openai.api_key = OPENAI_API_KEY
             response = openai.ChatCompletion.create(
                 model="gpt-4-turbo",
                 messages=[
@@ -82,7 +210,9 @@ class IntentParser:
                 json_match = re.search(r'```json\n(.*?)\n```', result, re.DOTALL)
                 if json_match:
                     result = json_match.group(1)
-                return json.loads(result)
+                parsed = json.loads(result)
+                self.cache.put(text, parsed)
+                return parsed
             except:
                 # Fallback auf einfaches Regex-Parsing
                 return self.extract_intent_regex(text)
@@ -93,14 +223,40 @@ class IntentParser:
             return self.extract_intent_regex(text)
     
     def parse(self, text):
-        """Parst den Text und gibt Intent und Entitäten zurück."""
-        # Versuche zuerst mit OpenAI
+        """
+        Parst den Text und gibt Intent und Entitäten zurück.
+        
+        Das Ergebnis enthält unter 'source' den Pfad, der die Nachricht
+        beantwortet hat: 'local', 'openai' oder 'regex'.
+        """
+        started = time.perf_counter()
+        
+        # Eindeutige Befehle lokal beantworten
+        local_result = self.local_classifier.classify(text)
+        if local_result['confidence'] >= self.local_confidence:
+            return self._finish(local_result, 'local', started)
+        
+        # Mehrdeutige Eingaben an OpenAI weitergeben
         try:
             result = self.parse_with_openai(text)
             if result and result.get('intent') != 'unknown':
-                return result
+                return self._finish(result, 'openai', started)
         except:
             pass
         
-        # Fallback auf Regex
-        return self.extract_intent_regex(text) 
\ No newline at end of file
+        # Fallback auf die lokale Erkennung mit niedriger Konfidenz bzw. Regex
+        if local_result['intent'] != 'unknown':
+            return self._finish(local_result, 'local', started)
+        return self._finish(self.extract_intent_regex(text), 'regex', started)
+    
+    def cache_stats(self):
+        """Gibt die Treffer-Statistik des Intent-Caches zurück."""
+        return self.cache.stats()
+    
+    def _finish(self, result, source, started):
+        """Ergänzt das Ergebnis um den verwendeten Pfad und protokolliert ihn."""
+        result = dict(result, source=source)
+        self.path_counts[source] += 1
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"Intent '{result.get('intent')}' über {source} erkannt ({elapsed_ms:.1f} ms)")
+        return result
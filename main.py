@@ -1,16 +1,32 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import io
 import logging
 import os
-from telegram import Update, ParseMode, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Updater, CommandHandler, MessageHandler, Filters, CallbackContext, ConversationHandler, CallbackQueryHandler
+import queue
+import asyncio
+import threading
+from functools import cached_property
+from startup_profile import startup_report
 
-from config import TELEGRAM_BOT_TOKEN, AUTHORIZED_USERS, DEFAULT_NETWORK
-from intent_parser import IntentParser
-from cardano_transaction import CardanoTransactionManager
-from cardano_wallet import CardanoWalletManager
-from telegram_audio import TelegramAudioProcessor
+with startup_report.measure("telegram"):
+    from telegram import Update, ParseMode, InlineKeyboardButton, InlineKeyboardMarkup
+    from telegram.ext import Updater, CommandHandler, MessageHandler, Filters, CallbackContext, ConversationHandler, CallbackQueryHandler
+    from telegram.utils.helpers import escape_markdown
+
+with startup_report.measure("config"):
+    from config import (
+        TELEGRAM_BOT_TOKEN, AUTHORIZED_USERS, DEFAULT_NETWORK,
+        TELEGRAM_WEBHOOK_URL, TELEGRAM_WEBHOOK_SECRET, WEBHOOK_QUEUE_SIZE, BOT_WORKERS,
+        TTS_VOICE_REPLIES
+    )
+from balance import asset_display_name
+from update_scheduler import UpdateScheduler
+from webhook_server import WebhookServer, WebhookQueueFull
+
+# Schwere Subsysteme (OpenAI, Blockfrost, pydub, Whisper, SQLite) werden erst bei
+# der ersten Verwendung importiert und erstellt, damit der Bot sofort Updates annimmt.
 
 # Logging einrichten
 logging.basicConfig(
@@ -23,30 +39,123 @@ CONFIRM = 1
 CREATE_WALLET = 2
 SELECT_NETWORK = 3
 
+
+class locked_cached_property(cached_property):
+    """
+    cached_property, das die Erstellung unter der Sperre der Instanz ausführt.
+    
+    functools.cached_property sperrt seit Python 3.12 nicht mehr; Job-Queue und
+    Dispatcher könnten sonst gleichzeitig zwei Instanzen eines Subsystems bauen.
+    Nach der Erstellung liegt der Wert im Instanz-Dict und wird ohne Sperre gelesen.
+    """
+    
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with instance._subsystem_lock:
+            return super().__get__(instance, owner)
+
+
 class CardanoVoiceAssistant:
-    def __init__(self):
-        self.intent_parser = IntentParser()
-        self.cardano_manager = CardanoTransactionManager(DEFAULT_NETWORK)
-        self.wallet_manager = CardanoWalletManager()
-        self.audio_processor = TelegramAudioProcessor()
-        
-        # Transaktion die auf Bestätigung wartet
-        self.pending_transaction = {}
-        
-        # Benutzereinstellungen
-        self.user_settings = {}
-        
+    def __init__(self, watch_addresses=True, shared_subscriptions=False):
+        """
+        :param watch_addresses: Abonnierte Wallets in diesem Prozess überwachen
+        :param shared_subscriptions: Abonnements anderer Prozesse übernehmen (Mehrprozessbetrieb)
+        """
+        self.watch_addresses = watch_addresses
+        self.shared_subscriptions = shared_subscriptions
+        self.bot = None
+        # Reentrant: Subsysteme erstellen beim Bauen ihre Abhängigkeiten
+        self._subsystem_lock = threading.RLock()
+        
+        # Updates eines Benutzers nacheinander, verschiedene Benutzer begrenzt parallel
+        self.update_scheduler = UpdateScheduler()
+    
+    @locked_cached_property
+    def intent_parser(self):
+        """Intent-Erkennung (lokal, Cache, OpenAI)."""
+        with startup_report.measure("IntentParser"):
+            from intent_parser import IntentParser
+            return IntentParser()
+    
+    @locked_cached_property
+    def cardano_manager(self):
+        """Blockfrost-Abfragen und Transaktionen."""
+        with startup_report.measure("CardanoTransactionManager"):
+            from cardano_transaction import CardanoTransactionManager
+            return CardanoTransactionManager(DEFAULT_NETWORK)
+    
+    @locked_cached_property
+    def wallet_manager(self):
+        """Wallet-Index und Wallet-Dateien."""
+        with startup_report.measure("CardanoWalletManager"):
+            from cardano_wallet import CardanoWalletManager
+            return CardanoWalletManager()
+    
+    @locked_cached_property
+    def audio_processor(self):
+        """Sprachnachrichten und Transkription."""
+        with startup_report.measure("TelegramAudioProcessor"):
+            from telegram_audio import TelegramAudioProcessor
+            return TelegramAudioProcessor()
+    
+    @locked_cached_property
+    def block_follower(self):
+        """Neue Blöcke pro Netzwerk, geteilt von Bestätigungs- und Adressüberwachung."""
+        from chain_follower import BlockFollower
+        return BlockFollower(self.cardano_manager)
+    
+    @locked_cached_property
+    def tx_watcher(self):
+        """Meldet Bestätigungen eingereichter Transaktionen (startet beim ersten Hash)."""
+        from tx_watcher import TransactionWatcher
+        return TransactionWatcher(self.cardano_manager, self.block_follower)
+    
+    @locked_cached_property
+    def address_watcher(self):
+        """Meldet neue Transaktionen abonnierter Wallets."""
+        from address_watcher import AddressWatcher
+        return AddressWatcher(
+            self.cardano_manager, self.wallet_manager, self.block_follower, self.notify_payment,
+            shared=self.shared_subscriptions
+        )
+    
+    @locked_cached_property
+    def tts(self):
+        """Sprachausgabe mit Cache gerenderter Sätze."""
+        with startup_report.measure("TextToSpeech"):
+            from text_to_speech import TextToSpeech
+            return TextToSpeech()
+    
+    @locked_cached_property
+    def user_state(self):
+        """Einstellungen und offene Bestätigungen pro Benutzer."""
+        with startup_report.measure("UserStateStore"):
+            from user_state import UserStateStore
+            return UserStateStore()
+        
+    def _is_loaded(self, name):
+        """Prüft, ob ein verzögert erstelltes Subsystem bereits gebaut wurde."""
+        return name in self.__dict__
+    
     def get_user_network(self, user_id):
         """Gibt das aktuelle Netzwerk für einen Benutzer zurück."""
-        if user_id not in self.user_settings:
-            self.user_settings[user_id] = {"network": DEFAULT_NETWORK}
-        return self.user_settings[user_id]["network"]
+        return self.user_state.get_setting(user_id, "network", DEFAULT_NETWORK)
     
     def set_user_network(self, user_id, network):
         """Setzt das Netzwerk für einen Benutzer."""
-        if user_id not in self.user_settings:
-            self.user_settings[user_id] = {}
-        self.user_settings[user_id]["network"] = network
+        self.user_state.set_setting(user_id, "network", network)
+    
+    async def start_watchers(self, context: CallbackContext) -> None:
+        """
+        Startet die Adressüberwachung beim Start des Bots (Job, läuft im Event-Loop).
+        
+        Gespeicherte Abonnements werden so auch nach einem Neustart sofort
+        überwacht, ohne dass ein Benutzer zuerst schreiben muss.
+        """
+        if self.watch_addresses:
+            from cardano_transaction import SUPPORTED_NETWORKS
+            self.address_watcher.start(SUPPORTED_NETWORKS)
         
     async def start(self, update: Update, context: CallbackContext) -> None:
         """Startet den Bot und sendet eine Begrüßungsnachricht."""
@@ -58,8 +167,9 @@ class CardanoVoiceAssistant:
             )
             return
         
-        # Standardnetzwerk setzen
-        self.set_user_network(user_id, DEFAULT_NETWORK)
+        # Standardnetzwerk setzen, eine gespeicherte Auswahl bleibt erhalten
+        if self.user_state.get_setting(user_id, "network") is None:
+            self.set_user_network(user_id, DEFAULT_NETWORK)
         
         await update.message.reply_text(
             f"Willkommen zum Cardano Sprachassistenten, {update.effective_user.first_name}!\n\n"
@@ -72,7 +182,8 @@ class CardanoVoiceAssistant:
             "Befehle:\n"
             "/wallet - Wallet-Verwaltung\n"
             "/network - Netzwerk wechseln\n"
-            "/balance - Kontostand abfragen"
+            "/balance - Kontostand abfragen\n"
+            "/subscribe - Zahlungsbenachrichtigungen aktivieren"
         )
         
     async def help_command(self, update: Update, context: CallbackContext) -> None:
@@ -95,7 +206,9 @@ class CardanoVoiceAssistant:
             "Verfügbare Befehle:\n"
             "/wallet - Wallet-Verwaltung\n"
             "/network - Netzwerk wechseln (aktuell: " + network + ")\n"
-            "/balance - Kontostand abfragen\n\n"
+            "/balance - Kontostand abfragen\n"
+            "/subscribe [Wallet] - Zahlungsbenachrichtigungen aktivieren\n"
+            "/unsubscribe [Wallet] - Zahlungsbenachrichtigungen beenden\n\n"
             "Sie können mir eine Textnachricht senden oder eine Sprachnachricht aufnehmen."
         )
         
@@ -111,14 +224,24 @@ class CardanoVoiceAssistant:
         # Vorhandene Wallets anzeigen
         wallets = self.wallet_manager.get_user_wallets(user_id, network)
         
+        # Kontostände aller Wallets gesammelt und parallel abfragen
+        balances = await self.cardano_manager.check_wallet_balances_async(
+            [wallet["address"] for wallet in wallets], network
+        )
+        
         keyboard = [
             [InlineKeyboardButton("➕ Neue Wallet erstellen", callback_data="create_wallet")]
         ]
         
         for wallet in wallets:
             wallet_name = wallet["name"]
+            balance_info = balances.get(wallet["address"], {})
+            if "error" in balance_info or not balance_info:
+                balance_text = "? ADA"
+            else:
+                balance_text = f"{balance_info['balance_ada']:.2f} ADA"
             keyboard.append([InlineKeyboardButton(
-                f"🔑 {wallet_name} - {wallet['address'][:8]}...{wallet['address'][-8:]}",
+                f"🔑 {wallet_name} - {balance_text} - {wallet['address'][:8]}...{wallet['address'][-8:]}",
                 callback_data=f"select_wallet_{wallet_name}"
             )])
         
@@ -163,10 +286,6 @@ class CardanoVoiceAssistant:
         
         network = self.get_user_network(user_id)
         
-        # Setze das richtige Netzwerk
-        if self.cardano_manager.network != network:
-            self.cardano_manager.connect_to_network(network)
-        
         # Hole die Standard-Wallet für den Benutzer
         wallet = self.wallet_manager.get_default_wallet(user_id, network)
         
@@ -179,7 +298,7 @@ class CardanoVoiceAssistant:
             
         await update.message.reply_text(f"Prüfe deinen Kontostand auf {network}...")
         
-        balance_info = self.cardano_manager.check_wallet_balance(wallet["address"])
+        balance_info = await self.cardano_manager.check_wallet_balance_async(wallet["address"], network)
         
         if "error" in balance_info:
             await update.message.reply_text(f"Fehler: {balance_info['error']}")
@@ -188,10 +307,50 @@ class CardanoVoiceAssistant:
         await update.message.reply_text(
             f"Dein Kontostand ({network}):\n\n"
             f"🏦 *{balance_info['balance_ada']:.6f} ADA*\n"
+            f"{self.format_assets(balance_info.get('balance'))}"
             f"🔑 Wallet: *{wallet['name']}*\n"
             f"📝 Adresse: `{wallet['address']}`",
             parse_mode=ParseMode.MARKDOWN
         )
+        await self.reply_voice(update, f"Dein Kontostand beträgt {balance_info['balance_ada']:.2f} ADA.")
+    
+    async def reply_voice(self, update: Update, text: str) -> None:
+        """
+        Beantwortet eine Sprachnachricht zusätzlich mit einer Sprachnachricht.
+        
+        Wiederholte Sätze werden nicht neu synthetisiert: bereits gesendete per
+        Telegram-file_id, sonst aus dem Cache gerenderter Audiodaten.
+        """
+        if not TTS_VOICE_REPLIES or not update.message or not update.message.voice:
+            return
+        
+        try:
+            file_id = self.tts.get_file_id(text)
+            if file_id:
+                await update.message.reply_voice(voice=file_id)
+                return
+            
+            audio = await self.tts.render_async(text)
+            if not audio:
+                return
+            message = await update.message.reply_voice(voice=io.BytesIO(audio))
+            if message and message.voice:
+                self.tts.set_file_id(text, message.voice.file_id)
+        except Exception as e:
+            logger.warning(f"Sprachantwort fehlgeschlagen: {e}")
+    
+    def format_assets(self, balance, limit=10):
+        """Formatiert die nativen Tokens eines Kontostands für die Anzeige."""
+        if not balance or not balance.assets:
+            return ""
+        # Token-Namen sind frei wählbar und dürfen das Markdown der Nachricht nicht brechen
+        lines = [
+            f"🪙 {escape_markdown(asset_display_name(asset_name))}: {quantity} (`{policy_id[:8]}…`)"
+            for (policy_id, asset_name), quantity in balance.assets[:limit]
+        ]
+        if len(balance.assets) > limit:
+            lines.append(f"… und {len(balance.assets) - limit} weitere Token")
+        return "\n".join(lines) + "\n"
     
     async def button_callback(self, update: Update, context: CallbackContext) -> int:
         """Callback für Inline-Buttons."""
@@ -216,11 +375,7 @@ class CardanoVoiceAssistant:
                 await query.edit_message_text(f"Wallet {wallet_name} nicht gefunden.")
                 return ConversationHandler.END
             
-            # Setze das richtige Netzwerk
-            if self.cardano_manager.network != network:
-                self.cardano_manager.connect_to_network(network)
-            
-            balance_info = self.cardano_manager.check_wallet_balance(wallet["address"])
+            balance_info = await self.cardano_manager.check_wallet_balance_async(wallet["address"], network)
             
             if "error" in balance_info:
                 balance_text = "Kontostand konnte nicht abgerufen werden."
@@ -240,10 +395,11 @@ class CardanoVoiceAssistant:
             old_network = self.get_user_network(user_id)
             
             if new_network != old_network:
-                self.set_user_network(user_id, new_network)
-                success = self.cardano_manager.connect_to_network(new_network)
+                # Der Client pro Netzwerk wird aus der Registry wiederverwendet
+                success = self.cardano_manager.is_network_available(new_network)
                 
                 if success:
+                    self.set_user_network(user_id, new_network)
                     await query.edit_message_text(
                         f"Netzwerk auf *{new_network}* umgestellt.\n\n"
                         f"Verwenden Sie /wallet, um Ihre Wallets für dieses Netzwerk zu verwalten.",
@@ -292,7 +448,7 @@ class CardanoVoiceAssistant:
         
         return ConversationHandler.END
     
-    async def handle_text(self, update: Update, context: CallbackContext) -> None:
+    async def handle_text(self, update: Update, context: CallbackContext) -> int:
         """Verarbeitet Textnachrichten."""
         user_id = update.effective_user.id
         
@@ -300,9 +456,9 @@ class CardanoVoiceAssistant:
             return
             
         text = update.message.text
-        await self.process_command(update, context, text)
+        return await self.process_command(update, context, text)
     
-    async def handle_voice(self, update: Update, context: CallbackContext) -> None:
+    async def handle_voice(self, update: Update, context: CallbackContext) -> int:
         """Verarbeitet Sprachnachrichten."""
         user_id = update.effective_user.id
         
@@ -318,8 +474,23 @@ class CardanoVoiceAssistant:
             await update.message.reply_text("Fehler beim Herunterladen der Sprachnachricht.")
             return
             
-        # Sprachnachricht transkribieren
-        transcript = await self.audio_processor.process_voice_message(voice_file)
+        # Sprachnachricht in die Transkriptions-Warteschlange einreihen
+        from telegram_audio import TranscriptionQueueFull
+        try:
+            job, position = self.audio_processor.submit_voice_message(user_id, voice_file)
+        except TranscriptionQueueFull:
+            self.audio_processor.discard_voice_file(voice_file)
+            await update.message.reply_text(
+                "Ich bin gerade ausgelastet. Bitte sende deine Sprachnachricht gleich noch einmal."
+            )
+            return
+        
+        if position > 0:
+            await update.message.reply_text(
+                f"Viel los gerade – deine Sprachnachricht ist auf Position {position} in der Warteschlange."
+            )
+        
+        transcript = await job
         
         if not transcript:
             await update.message.reply_text("Konnte deine Sprachnachricht nicht verstehen.")
@@ -328,17 +499,13 @@ class CardanoVoiceAssistant:
         await update.message.reply_text(f"Ich habe verstanden: \"{transcript}\"")
         
         # Befehl verarbeiten
-        await self.process_command(update, context, transcript)
+        return await self.process_command(update, context, transcript)
     
     async def process_command(self, update: Update, context: CallbackContext, text: str) -> int:
         """Verarbeitet einen Befehl (Text oder transkribierte Sprache)."""
         user_id = update.effective_user.id
         network = self.get_user_network(user_id)
         
-        # Stelle sicher, dass wir das richtige Netzwerk verwenden
-        if self.cardano_manager.network != network:
-            self.cardano_manager.connect_to_network(network)
-        
         parsed_intent = self.intent_parser.parse(text)
         
         intent = parsed_intent.get('intent')
@@ -372,13 +539,12 @@ class CardanoVoiceAssistant:
                 return ConversationHandler.END
                 
             # Transaktion zur Bestätigung speichern
-            self.pending_transaction = {
-                'user_id': update.effective_user.id,
+            self.user_state.set_pending(user_id, {
                 'wallet': wallet,
                 'amount': amount,
                 'recipient': recipient,
                 'network': network
-            }
+            })
             
             # Bestätigung anfordern
             await update.message.reply_text(
@@ -387,6 +553,10 @@ class CardanoVoiceAssistant:
                 f"Antworte mit 'ja' oder 'nein'.",
                 parse_mode=ParseMode.MARKDOWN
             )
+            await self.reply_voice(
+                update,
+                f"Möchtest du {amount} ADA von Wallet {wallet['name']} senden? Antworte mit ja oder nein."
+            )
             
             return CONFIRM
             
@@ -402,21 +572,19 @@ class CardanoVoiceAssistant:
         """Bestätigt eine Transaktion."""
         user_id = update.effective_user.id
         
-        if not self.pending_transaction or self.pending_transaction.get('user_id') != user_id:
+        # Offene Transaktion entnehmen (abgelaufene Bestätigungen gelten als nicht vorhanden)
+        pending_transaction = self.user_state.pop_pending(user_id)
+        if not pending_transaction:
             await update.message.reply_text("Keine ausstehende Transaktion gefunden.")
             return ConversationHandler.END
             
         text = update.message.text.lower()
         
         if text in ['ja', 'yes', 'y', 'bestätigen', 'bestätige']:
-            wallet = self.pending_transaction.get('wallet')
-            amount = self.pending_transaction.get('amount')
-            recipient = self.pending_transaction.get('recipient')
-            network = self.pending_transaction.get('network')
-            
-            # Stelle sicher, dass wir das richtige Netzwerk verwenden
-            if self.cardano_manager.network != network:
-                self.cardano_manager.connect_to_network(network)
+            wallet = pending_transaction.get('wallet')
+            amount = pending_transaction.get('amount')
+            recipient = pending_transaction.get('recipient')
+            network = pending_transaction.get('network')
             
             await update.message.reply_text(
                 f"Führe Transaktion aus: {amount} ADA an {recipient}...\n"
@@ -424,7 +592,7 @@ class CardanoVoiceAssistant:
             )
             
             # Transaktion ausführen
-            result = self.cardano_manager.send_ada(wallet, recipient, amount)
+            result = await self.cardano_manager.send_ada_async(wallet, recipient, amount, network)
             
             if "error" in result:
                 await update.message.reply_text(f"❌ Fehler: {result['error']}")
@@ -437,35 +605,171 @@ class CardanoVoiceAssistant:
                     f"_Netzwerk: {result['transaction_details']['network']}_",
                     parse_mode=ParseMode.MARKDOWN
                 )
+                
+                # Bestätigung im Hintergrund überwachen (nur bei tatsächlich eingereichten Transaktionen)
+                tx_hash = result.get('tx_hash')
+                if tx_hash:
+                    self.watch_transaction(context, update.effective_chat.id, tx_hash, network)
+                    await update.message.reply_text("Ich melde mich, sobald die Transaktion bestätigt ist.")
         else:
             await update.message.reply_text("Transaktion abgebrochen.")
-            
-        # Transaktion zurücksetzen
-        self.pending_transaction = {}
         
         return ConversationHandler.END
     
+    def watch_transaction(self, context: CallbackContext, chat_id, tx_hash, network):
+        """Meldet die Bestätigung einer Transaktion im Chat."""
+        async def notify(status):
+            if "error" in status:
+                text = f"⚠️ {status['error']}\n`{tx_hash}`"
+            else:
+                text = (
+                    f"✅ *Transaktion bestätigt*\n\n"
+                    f"🔸 Hash: `{tx_hash}`\n"
+                    f"🔸 Block: *{status['block_height']}*\n\n"
+                    f"_Netzwerk: {network}_"
+                )
+            await context.bot.send_message(chat_id=chat_id, text=text, parse_mode=ParseMode.MARKDOWN)
+        
+        self.tx_watcher.track(tx_hash, network, notify)
+    
+    async def subscribe_command(self, update: Update, context: CallbackContext) -> None:
+        """Aktiviert Zahlungsbenachrichtigungen für eine Wallet (Standard-Wallet ohne Argument)."""
+        user_id = update.effective_user.id
+        
+        if AUTHORIZED_USERS and user_id not in AUTHORIZED_USERS:
+            return
+        
+        network = self.get_user_network(user_id)
+        
+        if context.args:
+            wallet_name = context.args[0]
+        else:
+            wallet = self.wallet_manager.get_default_wallet(user_id, network)
+            if not wallet:
+                await update.message.reply_text("Es konnte keine Wallet gefunden oder erstellt werden.")
+                return
+            wallet_name = wallet["name"]
+        
+        result = self.wallet_manager.subscribe_wallet(user_id, network, wallet_name, update.effective_chat.id)
+        if not result["success"]:
+            await update.message.reply_text(f"❌ Fehler: {result['error']}")
+            return
+        
+        # Im Mehrprozessbetrieb übernimmt der überwachende Prozess das Abonnement aus dem Index
+        if self.watch_addresses:
+            self.address_watcher.subscribe(result["subscription"])
+        await update.message.reply_text(
+            f"🔔 Benachrichtigungen für Wallet *{wallet_name}* ({network}) aktiviert.",
+            parse_mode=ParseMode.MARKDOWN
+        )
+    
+    async def unsubscribe_command(self, update: Update, context: CallbackContext) -> None:
+        """Beendet Zahlungsbenachrichtigungen für eine Wallet (Standard-Wallet ohne Argument)."""
+        user_id = update.effective_user.id
+        
+        if AUTHORIZED_USERS and user_id not in AUTHORIZED_USERS:
+            return
+        
+        network = self.get_user_network(user_id)
+        
+        if context.args:
+            wallet_name = context.args[0]
+        else:
+            wallet = self.wallet_manager.index.first(user_id, network)
+            wallet_name = wallet["name"] if wallet else ""
+        
+        result = self.wallet_manager.unsubscribe_wallet(user_id, network, wallet_name)
+        if not result["success"]:
+            await update.message.reply_text(f"❌ Fehler: {result['error']}")
+            return
+        
+        if self.watch_addresses:
+            self.address_watcher.unsubscribe(user_id, network, wallet_name)
+        await update.message.reply_text(f"🔕 Benachrichtigungen für Wallet {wallet_name} beendet.")
+    
+    async def notify_payment(self, subscription, change):
+        """Meldet neue Transaktionen einer abonnierten Wallet im Chat."""
+        if self.bot is None:
+            return
+        
+        diff = change["diff"]
+        balance = change["balance"]
+        if diff is not None:
+            lovelace = diff["lovelace"]
+            # Nur Eingänge melden; Ausgänge hat der Benutzer selbst veranlasst
+            if lovelace <= 0 and not any(quantity > 0 for quantity in diff["assets"].values()):
+                return
+            lines = [f"💰 *Zahlungseingang auf Wallet {subscription['name']}*\n"]
+            if lovelace > 0:
+                lines.append(f"🔸 +{lovelace / 1000000:.6f} ADA")
+            for (policy_id, asset_name), quantity in diff["assets"].items():
+                if quantity > 0:
+                    lines.append(f"🪙 +{quantity} {escape_markdown(asset_display_name(asset_name))} (`{policy_id[:8]}…`)")
+        else:
+            lines = [f"🔔 *Neue Transaktion auf Wallet {subscription['name']}*\n"]
+        
+        lines.append(f"\nNeuer Kontostand: *{balance.ada:.6f} ADA*")
+        lines.append(f"_Netzwerk: {change['network']}_")
+        await self.bot.send_message(
+            chat_id=subscription["chat_id"],
+            text="\n".join(lines),
+            parse_mode=ParseMode.MARKDOWN
+        )
+    
+    async def status_command(self, update: Update, context: CallbackContext) -> None:
+        """Zeigt die Auslastung des Bots (Warteschlangen und Wartezeiten)."""
+        user_id = update.effective_user.id
+        
+        if AUTHORIZED_USERS and user_id not in AUTHORIZED_USERS:
+            return
+        
+        # Nur bereits gebaute Subsysteme abfragen, damit /status nichts nachlädt
+        not_loaded = "nicht geladen"
+        updates = self.update_scheduler.stats()
+        if self._is_loaded("audio_processor"):
+            transcription = self.audio_processor.scheduler.stats()
+            transcription = f"{transcription['active']} laufend, {transcription['queued']} wartend"
+        else:
+            transcription = not_loaded
+        addresses = self.address_watcher.address_count() if self._is_loaded("address_watcher") else not_loaded
+        pending = self.tx_watcher.pending_count() if self._is_loaded("tx_watcher") else not_loaded
+        await update.message.reply_text(
+            "📊 Status\n\n"
+            f"Updates: {updates['running']} laufend, {updates['queued']} wartend "
+            f"({updates['active_users']} Benutzer)\n"
+            f"Wartezeit: Ø {updates['avg_wait_ms']} ms, max. {updates['max_wait_ms']} ms\n"
+            f"Transkription: {transcription}\n"
+            f"Überwachte Adressen: {addresses}\n"
+            f"Offene Transaktionen: {pending}"
+        )
+    
     async def cancel(self, update: Update, context: CallbackContext) -> int:
         """Bricht den Konversationsstatus ab."""
+        self.user_state.pop_pending(update.effective_user.id)
         await update.message.reply_text("Vorgang abgebrochen.")
         return ConversationHandler.END
         
-    def run(self):
-        """Startet den Bot."""
+    def build_updater(self):
+        """Erstellt den Updater und registriert alle Handler."""
         # Create the Updater and pass it your bot's token.
         updater = Updater(TELEGRAM_BOT_TOKEN)
 
         # Get the dispatcher to register handlers
         dispatcher = updater.dispatcher
+        self.bot = updater.bot
+        
+        # Überwachung einmalig beim Start, nicht erst beim ersten Update
+        updater.job_queue.run_once(self.start_watchers, 0)
 
-        # Transaktions-Konversationshandler
+        # Transaktions-Konversationshandler; Nachrichten laufen pro Benutzer geordnet über den Scheduler
+        schedule = self.update_scheduler.wrap
         transaction_handler = ConversationHandler(
             entry_points=[
-                MessageHandler(Filters.text & ~Filters.command, self.handle_text),
-                MessageHandler(Filters.voice, self.handle_voice),
+                MessageHandler(Filters.text & ~Filters.command, schedule(self.handle_text)),
+                MessageHandler(Filters.voice, schedule(self.handle_voice)),
             ],
             states={
-                CONFIRM: [MessageHandler(Filters.text & ~Filters.command, self.confirm_transaction)],
+                CONFIRM: [MessageHandler(Filters.text & ~Filters.command, schedule(self.confirm_transaction))],
             },
             fallbacks=[CommandHandler("cancel", self.cancel)],
         )
@@ -485,6 +789,9 @@ class CardanoVoiceAssistant:
         dispatcher.add_handler(CommandHandler("balance", self.balance_command))
         dispatcher.add_handler(CommandHandler("wallet", self.wallet_command))
         dispatcher.add_handler(CommandHandler("network", self.network_command))
+        dispatcher.add_handler(CommandHandler("subscribe", self.subscribe_command))
+        dispatcher.add_handler(CommandHandler("unsubscribe", self.unsubscribe_command))
+        dispatcher.add_handler(CommandHandler("status", self.status_command))
         
         # Button-Callbacks
         dispatcher.add_handler(CallbackQueryHandler(self.button_callback, pattern=r'^(select_wallet_|network_)'))
@@ -492,10 +799,54 @@ class CardanoVoiceAssistant:
         # Konversationshandler registrieren
         dispatcher.add_handler(wallet_creation_handler)
         dispatcher.add_handler(transaction_handler)
-
+        
+        return updater
+    
+    def run(self):
+        """Startet den Bot."""
+        updater = self.build_updater()
+        
         # Starte den Bot
-        updater.start_polling()
-        updater.idle()
+        if TELEGRAM_WEBHOOK_URL:
+            self.run_webhook(updater)
+        else:
+            updater.start_polling()
+            startup_report.mark_ready()
+            updater.idle()
+    
+    def run_webhook(self, updater):
+        """
+        Empfängt Updates über den eingebetteten Webhook-Server statt per Polling.
+        
+        Eingehende Updates werden direkt in die Update-Queue des Dispatchers
+        gelegt; ist sie voll, antwortet der Server mit 503 und Telegram stellt
+        das Update später erneut zu.
+        """
+        dispatcher = updater.dispatcher
+        bot = updater.bot
+        dispatcher.update_queue = queue.Queue(maxsize=WEBHOOK_QUEUE_SIZE)
+        
+        def enqueue(data):
+            try:
+                dispatcher.update_queue.put_nowait(Update.de_json(data, bot))
+            except queue.Full:
+                raise WebhookQueueFull()
+        
+        server = WebhookServer(TELEGRAM_WEBHOOK_SECRET, enqueue)
+        bot.set_webhook(url=TELEGRAM_WEBHOOK_URL, secret_token=TELEGRAM_WEBHOOK_SECRET)
+        threading.Thread(target=dispatcher.start, name="dispatcher", daemon=True).start()
+        # start_polling startet die JobQueue selbst, der Webhook-Modus nicht
+        updater.job_queue.start()
+        startup_report.mark_ready()
+        
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            updater.job_queue.stop()
+            dispatcher.stop()
+            bot.delete_webhook()
 
 
 def main():
@@ -506,6 +857,11 @@ def main():
         print("Bitte setze die Umgebungsvariable TELEGRAM_BOT_TOKEN.")
         return
         
+    # Der Webhook-Modus nimmt nur Anfragen mit Secret-Token an
+    if TELEGRAM_WEBHOOK_URL and not TELEGRAM_WEBHOOK_SECRET:
+        print("FEHLER: TELEGRAM_WEBHOOK_URL ist gesetzt, aber TELEGRAM_WEBHOOK_SECRET fehlt.")
+        return
+        
     # Prüfe, ob OpenAI API-Key konfiguriert ist
     if not os.getenv("OPENAI_API_KEY"):
         print("FEHLER: OpenAI API-Key ist nicht konfiguriert.")
@@ -517,6 +873,16 @@ def main():
         print("WARNUNG: Keine Blockfrost-Projekt-IDs konfiguriert.")
         print("Cardano-Transaktionen werden nicht funktionieren.")
 
+    # Mehrere Worker-Prozesse: Ingress verteilt die Updates nach Benutzer-ID
+    if BOT_WORKERS > 1:
+        if not TELEGRAM_WEBHOOK_URL:
+            print("FEHLER: BOT_WORKERS > 1 erfordert den Webhook-Modus (TELEGRAM_WEBHOOK_URL).")
+            return
+        from sharding import ShardedIngress
+        print(f"Starte Cardano Voice Assistant Bot mit {BOT_WORKERS} Worker-Prozessen...")
+        ShardedIngress(BOT_WORKERS).run()
+        return
+
     print("Starte Cardano Voice Assistant Bot...")
     assistant = CardanoVoiceAssistant()
     assistant.run()
@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import atexit
+import shutil
+import tempfile
+import threading
+
+# Wartezeit bis zum nächsten Versuch, wenn die neue Epoche noch nicht sichtbar ist
+EPOCH_RETRY_SECONDS = 60
+
+
+class ProtocolParametersCache:
+    """
+    Protokollparameter pro Netzwerk, gültig bis zum Ende der aktuellen Epoche.
+
+    Die Parameter werden nur beim Epochenwechsel neu abgerufen. Wird eine Datei
+    benötigt (z.B. für cardano-cli), wird sie einmal pro Epoche unter einem
+    eindeutigen Pfad geschrieben und von allen Transaktionen schreibgeschützt geteilt.
+    """
+
+    def __init__(self, base_dir=None):
+        self._base_dir = base_dir
+        # network -> {"epoch", "params", "valid_until", "path"}
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._network_locks = {}
+
+    def _network_lock(self, network):
+        """Gibt den Lock für ein Netzwerk zurück, damit pro Netzwerk nur einmal geladen wird."""
+        with self._lock:
+            return self._network_locks.setdefault(network, threading.Lock())
+
+    def get(self, api, network):
+        """
+        Gibt die Protokollparameter der aktuellen Epoche zurück.
+
+        :param api: Blockfrost-Client des Netzwerks
+        :param network: 'testnet' oder 'mainnet'
+        :return: Protokollparameter als Dict
+        """
+        return self._entry(api, network)["params"]
+
+    def _entry(self, api, network):
+        """Gibt den gültigen Cache-Eintrag zurück und lädt ihn bei Bedarf neu."""
+        entry = self._entries.get(network)
+        if entry and time.time() < entry["valid_until"]:
+            return entry
+
+        with self._network_lock(network):
+            entry = self._entries.get(network)
+            if entry and time.time() < entry["valid_until"]:
+                return entry
+
+            epoch_info = api.epoch_latest()
+            epoch = epoch_info.epoch
+            valid_until = epoch_info.end_time
+            if valid_until <= time.time():
+                valid_until = time.time() + EPOCH_RETRY_SECONDS
+
+            if entry and entry["epoch"] == epoch:
+                # Noch dieselbe Epoche: nur die Gültigkeit verlängern
+                entry = dict(entry, valid_until=valid_until)
+            else:
+                params = api.epoch_latest_parameters().to_dict()
+                entry = {
+                    "epoch": epoch,
+                    "params": params,
+                    "valid_until": valid_until,
+                    "path": None
+                }
+                print(f"Protokollparameter für {network} geladen (Epoche {epoch})")
+
+            self._entries[network] = entry
+            return entry
+
+    def _get_base_dir(self):
+        """Erstellt beim ersten Bedarf ein privates Verzeichnis für Parameterdateien."""
+        with self._lock:
+            if self._base_dir is None:
+                self._base_dir = tempfile.mkdtemp(prefix="cardano-protocol-")
+                atexit.register(shutil.rmtree, self._base_dir, True)
+            return self._base_dir
+
+    def get_file(self, api, network):
+        """
+        Gibt den Pfad einer schreibgeschützten Datei mit den Protokollparametern zurück.
+
+        :param api: Blockfrost-Client des Netzwerks
+        :param network: 'testnet' oder 'mainnet'
+        :return: Pfad zur JSON-Datei der aktuellen Epoche
+        """
+        entry = self._entry(api, network)
+        if entry["path"]:
+            return entry["path"]
+
+        with self._network_lock(network):
+            entry = self._entries[network]
+            if entry["path"]:
+                return entry["path"]
+
+            base_dir = self._get_base_dir()
+            path = os.path.join(base_dir, f"{network}-epoch{entry['epoch']}.json")
+            fd, tmp_path = tempfile.mkstemp(dir=base_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry["params"], f)
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, path)
+
+            self._remove_old_files(base_dir, network, entry["epoch"])
+            self._entries[network] = dict(entry, path=path)
+            return path
+
+    @staticmethod
+    def _remove_old_files(base_dir, network, epoch):
+        """Entfernt Dateien älterer Epochen; die Vorepoche bleibt für laufende Transaktionen erhalten."""
+        prefix = f"{network}-epoch"
+        for name in os.listdir(base_dir):
+            if not (name.startswith(prefix) and name.endswith(".json")):
+                continue
+            try:
+                file_epoch = int(name[len(prefix):-len(".json")])
+            except ValueError:
+                continue
+            if file_epoch < epoch - 1:
+                try:
+                    os.remove(os.path.join(base_dir, name))
+                except OSError:
+                    pass
+
+    def invalidate(self, network):
+        """Verwirft die zwischengespeicherten Parameter eines Netzwerks."""
+        with self._lock:
+            self._entries.pop(network, None)
@@ -0,0 +1,197 @@
+import time
+import queue
+import bisect
+import asyncio
+import hashlib
+import threading
+import multiprocessing
+from config import (
+    TELEGRAM_BOT_TOKEN, TELEGRAM_WEBHOOK_URL, TELEGRAM_WEBHOOK_SECRET,
+    BOT_WORKERS, SHARD_QUEUE_SIZE
+)
+from webhook_server import WebhookServer, WebhookQueueFull
+
+# Virtuelle Knoten pro Worker; glättet die Verteilung auf dem Ring
+RING_REPLICAS = 100
+
+# Abstand, in dem der Ingress abgestürzte Worker neu startet (Sekunden)
+SUPERVISE_INTERVAL = 5
+
+# Update-Felder, deren Absender das Update einem Benutzer zuordnet
+_USER_FIELDS = (
+    "message", "edited_message", "callback_query", "inline_query", "chosen_inline_result",
+    "shipping_query", "pre_checkout_query", "my_chat_member", "chat_member", "chat_join_request"
+)
+
+
+def _hash(value):
+    """Stabiler 64-Bit-Hash (unabhängig von PYTHONHASHSEED, identisch in allen Prozessen)."""
+    return int.from_bytes(hashlib.md5(str(value).encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Konsistentes Hashing von Schlüsseln auf Worker.
+
+    Ändert sich die Anzahl der Worker, wechselt nur etwa 1/N der Benutzer den
+    Worker statt fast aller (wie bei ``user_id % N``).
+    """
+
+    def __init__(self, nodes, replicas=RING_REPLICAS):
+        self._points = []
+        self._nodes = []
+        for node in nodes:
+            for replica in range(replicas):
+                point = _hash(f"{node}-{replica}")
+                index = bisect.bisect(self._points, point)
+                self._points.insert(index, point)
+                self._nodes.insert(index, node)
+
+    def get_node(self, key):
+        """Gibt den Worker für einen Schlüssel zurück."""
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._nodes[index]
+
+
+def extract_user_id(update):
+    """
+    Ermittelt die Benutzer-ID eines Updates (effective_user).
+
+    :param update: Update als Dict (JSON der Bot API)
+    :return: Benutzer-ID oder die Update-ID, wenn kein Benutzer enthalten ist
+    """
+    for field in _USER_FIELDS:
+        payload = update.get(field)
+        if payload and "from" in payload:
+            return payload["from"]["id"]
+    poll_answer = update.get("poll_answer")
+    if poll_answer and "user" in poll_answer:
+        return poll_answer["user"]["id"]
+    return update.get("update_id")
+
+
+def worker_main(index, count, updates):
+    """
+    Einstiegspunkt eines Worker-Prozesses.
+
+    Jeder Worker besitzt den Zustand, die Caches und die Konversationen seiner
+    Benutzer. Nur Worker 0 überwacht abonnierte Wallets, damit jede
+    Zahlungsbenachrichtigung genau einmal verschickt wird; die Überwachung
+    startet sofort mit dem Prozess, unabhängig von eingehenden Updates.
+    """
+    from telegram import Update
+    from main import CardanoVoiceAssistant
+    from startup_profile import startup_report
+    from blockfrost_client import set_process_share
+
+    # Alle Worker teilen sich das Blockfrost-Limit der Projekt-ID
+    set_process_share(count)
+
+    assistant = CardanoVoiceAssistant(watch_addresses=(index == 0), shared_subscriptions=True)
+    updater = assistant.build_updater()
+    dispatcher = updater.dispatcher
+    threading.Thread(target=dispatcher.start, name="dispatcher", daemon=True).start()
+    # Führt den in build_updater eingeplanten Start der Adressüberwachung aus
+    updater.job_queue.start()
+    print(f"Worker {index + 1}/{count} bereit")
+    startup_report.mark_ready()
+
+    try:
+        while True:
+            data = updates.get()
+            if data is None:
+                break
+            dispatcher.update_queue.put(Update.de_json(data, updater.bot))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        updater.job_queue.stop()
+        dispatcher.stop()
+
+
+class ShardedIngress:
+    """
+    Eingangsprozess für den Mehrprozessbetrieb.
+
+    Nimmt Updates über den Webhook-Server an und verteilt sie per konsistentem
+    Hashing der Benutzer-ID auf die Worker-Prozesse. Alle Updates eines
+    Benutzers landen so im selben Prozess, auch bei laufender Konversation.
+    """
+
+    def __init__(self, workers=BOT_WORKERS, queue_size=SHARD_QUEUE_SIZE):
+        self.worker_count = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._queues = [self._context.Queue(maxsize=queue_size) for _ in range(workers)]
+        self._processes = [None] * workers
+        self.ring = HashRing(range(workers))
+        self.routed = [0] * workers
+
+    def _start_worker(self, index):
+        """Startet den Prozess eines Workers (auch nach einem Absturz mit derselben Queue)."""
+        process = self._context.Process(
+            target=worker_main,
+            args=(index, self.worker_count, self._queues[index]),
+            name=f"bot-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        self._processes[index] = process
+
+    def enqueue(self, update):
+        """Leitet ein Update an den zuständigen Worker weiter."""
+        index = self.ring.get_node(extract_user_id(update))
+        try:
+            self._queues[index].put_nowait(update)
+        except queue.Full:
+            raise WebhookQueueFull()
+        self.routed[index] += 1
+
+    async def _supervise(self):
+        """Startet beendete Worker neu; ihre Benutzer bleiben ihnen zugeordnet."""
+        while True:
+            await asyncio.sleep(SUPERVISE_INTERVAL)
+            for index, process in enumerate(self._processes):
+                if not process.is_alive():
+                    print(f"Worker {index + 1} beendet (Code {process.exitcode}), starte neu")
+                    self._start_worker(index)
+
+    async def _serve(self, server):
+        supervisor = asyncio.get_running_loop().create_task(self._supervise())
+        try:
+            await server.serve_forever()
+        finally:
+            supervisor.cancel()
+
+    def run(self):
+        """Startet Worker und Webhook-Server und läuft bis zum Abbruch."""
+        from telegram import Bot
+
+        for index in range(self.worker_count):
+            self._start_worker(index)
+
+        bot = Bot(TELEGRAM_BOT_TOKEN)
+        server = WebhookServer(TELEGRAM_WEBHOOK_SECRET, self.enqueue)
+        bot.set_webhook(url=TELEGRAM_WEBHOOK_URL, secret_token=TELEGRAM_WEBHOOK_SECRET)
+        print(f"Ingress verteilt Updates auf {self.worker_count} Worker")
+
+        try:
+            asyncio.run(self._serve(server))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            bot.delete_webhook()
+            self.stop()
+
+    def stop(self, timeout=10):
+        """Beendet alle Worker geordnet."""
+        for update_queue in self._queues:
+            try:
+                update_queue.put(None, timeout=1)
+            except queue.Full:
+                pass
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            if process is not None:
+                process.join(max(0, deadline - time.monotonic()))
+                if process.is_alive():
+                    process.terminate()
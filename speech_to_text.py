@@ -0,0 +1,99 @@
+import threading
+from config import (
+    OPENAI_API_KEY, STT_BACKEND, STT_LOCAL_MODEL, STT_LOCAL_COMPUTE_TYPE,
+    STT_CPU_THREADS, STT_LANGUAGE
+)
+
+
+class OpenAIWhisperBackend:
+    """Transkription über die OpenAI Whisper-API."""
+
+    name = "openai"
+
+    def __init__(self):
+        import openai
+        openai.api_key = OPENAI_API_KEY
+        self.openai = openai
+
+    def transcribe(self, audio_file):
+        """
+        Transkribiert eine Audiodatei.
+
+        :param audio_file: Geöffnetes Dateiobjekt (mit Dateinamen für die Formaterkennung)
+        :return: Transkription als Text
+        """
+        transcription = self.openai.Audio.transcribe(
+            model="whisper-1",
+            file=audio_file
+        )
+        return transcription.get("text", "")
+
+
+class LocalWhisperBackend:
+    """
+    Lokale Transkription mit faster-whisper auf der CPU.
+
+    Das Modell wird einmal geladen und bleibt für alle Aufrufe im Speicher.
+    Feste Sprache und Greedy-Decoding halten kurze Befehle unter der
+    Latenz eines API-Aufrufs.
+    """
+
+    name = "local"
+
+    def __init__(self, model_size=STT_LOCAL_MODEL, compute_type=STT_LOCAL_COMPUTE_TYPE,
+                 cpu_threads=STT_CPU_THREADS, language=STT_LANGUAGE):
+        # Optionale Abhängigkeit erst hier importieren
+        from faster_whisper import WhisperModel
+
+        self.language = language
+        self.model = WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=cpu_threads
+        )
+        print(f"Lokales Whisper-Modell geladen ({model_size}, {compute_type})")
+
+    def transcribe(self, audio_file):
+        """
+        Transkribiert eine Audiodatei.
+
+        :param audio_file: Geöffnetes Dateiobjekt oder Pfad
+        :return: Transkription als Text
+        """
+        segments, _ = self.model.transcribe(
+            audio_file,
+            language=self.language,
+            beam_size=1,
+            vad_filter=True,
+            condition_on_previous_text=False
+        )
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_stt_backend():
+    """
+    Gibt das per STT_BACKEND konfigurierte Spracherkennungs-Backend zurück.
+
+    Das Backend wird einmal pro Prozess erstellt. Kann das lokale Modell nicht
+    geladen werden, wird auf die OpenAI-API zurückgegriffen.
+    """
+    global _backend
+    if _backend is not None:
+        return _backend
+
+    with _backend_lock:
+        if _backend is None:
+            if STT_BACKEND == "local":
+                try:
+                    _backend = LocalWhisperBackend()
+                except Exception as e:
+                    print(f"Lokale Spracherkennung nicht verfügbar, verwende OpenAI: {e}")
+                    _backend = OpenAIWhisperBackend()
+            else:
+                _backend = OpenAIWhisperBackend()
+        return _backend
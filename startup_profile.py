@@ -0,0 +1,47 @@
+import time
+from contextlib import contextmanager
+
+# Zeitpunkt des ersten Imports dieses Moduls (ca. Prozessstart)
+_PROCESS_START = time.perf_counter()
+
+
+class StartupReport:
+    """
+    Misst die Startzeit einzelner Module und Subsysteme.
+
+    Einträge vor ``mark_ready()`` gehören zum Kaltstart, spätere zur ersten
+    Verwendung eines verzögert erstellten Subsystems und werden sofort ausgegeben.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.ready_at = None
+
+    @contextmanager
+    def measure(self, label):
+        """Misst die Dauer eines Blocks (Import oder Konstruktion)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.entries.append((label, elapsed))
+            if self.ready_at is not None:
+                print(f"{label} bei erster Verwendung geladen ({elapsed * 1000:.0f} ms)")
+
+    def mark_ready(self):
+        """Markiert den Zeitpunkt, ab dem der Bot Updates annimmt, und gibt den Bericht aus."""
+        self.ready_at = time.perf_counter()
+        print(self.report())
+
+    def report(self):
+        """Gibt den Startzeit-Bericht als Text zurück (langsamste Einträge zuerst)."""
+        lines = ["Startzeit:"]
+        for label, elapsed in sorted(self.entries, key=lambda entry: -entry[1]):
+            lines.append(f"  {label}: {elapsed * 1000:.0f} ms")
+        total = (self.ready_at or time.perf_counter()) - _PROCESS_START
+        lines.append(f"  gesamt bis bereit: {total * 1000:.0f} ms")
+        return "\n".join(lines)
+
+
+startup_report = StartupReport()
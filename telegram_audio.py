@@ -1,32 +1,166 @@
+import io
 import os
+import asyncio
 import tempfile
-import openai
-from config import OPENAI_API_KEY
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from speech_to_text import get_stt_backend
+from audio_preprocessing import preprocess_audio
+from config import (
+    VOICE_MEMORY_LIMIT_BYTES,
+    TRANSCRIPTION_WORKERS, TRANSCRIPTION_QUEUE_SIZE, TRANSCRIPTION_MAX_PER_USER
+)
 
-# OpenAI API-Key setzen
-openai.api_key = OPENAI_API_KEY
 
-class TelegramAudioProcessor:
-    def __init__(self):
-        pass
+class TranscriptionQueueFull(Exception):
+    """Die Transkriptions-Warteschlange (gesamt oder für den Benutzer) ist voll."""
+
+
+class TranscriptionScheduler:
+    """
+    Begrenzte Warteschlange für Transkriptionen mit fester Anzahl paralleler Worker.
+    
+    Aufträge werden reihum pro Benutzer abgearbeitet, sodass ein einzelner
+    Benutzer mit vielen Sprachnachrichten andere nicht ausbremst.
+    """
+    
+    def __init__(self, transcribe, workers=TRANSCRIPTION_WORKERS,
+                 max_queue=TRANSCRIPTION_QUEUE_SIZE, max_per_user=TRANSCRIPTION_MAX_PER_USER):
+        """
+        :param transcribe: Blockierende Funktion, die eine Audiodatei transkribiert
+        :param workers: Anzahl gleichzeitig laufender Transkriptionen
+        :param max_queue: Maximale Anzahl wartender Aufträge insgesamt
+        :param max_per_user: Maximale Anzahl wartender Aufträge pro Benutzer
+        """
+        self._transcribe = transcribe
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transcription")
+        # user_id -> deque[(future, audio)], Reihenfolge = Round-Robin-Reihenfolge
+        self._queues = OrderedDict()
+        self._queued = 0
+        self._active = 0
+        self._wakeup = None
+        self._tasks = []
+    
+    def _ensure_started(self):
+        """Startet die Worker beim ersten Auftrag im laufenden Event-Loop."""
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+    
+    def _jobs_ahead(self, user_id):
+        """Schätzt, wie viele wartende Aufträge bei Round-Robin vor einem neuen Auftrag liegen."""
+        own = len(self._queues.get(user_id, ()))
+        ahead = own
+        for other_id, queue in self._queues.items():
+            if other_id != user_id:
+                ahead += min(len(queue), own + 1)
+        return ahead
+    
+    def submit(self, user_id, audio):
+        """
+        Reiht eine Transkription ein.
         
-    async def process_voice_message(self, voice_file):
+        :param user_id: Telegram-Benutzer-ID (für die faire Verteilung)
+        :param audio: Dateiobjekt oder Pfad, der an die Transkription übergeben wird
+        :return: Tupel aus Future mit dem Transkript und Warteposition (0 = startet sofort)
+        :raises TranscriptionQueueFull: wenn kein Platz in der Warteschlange ist
         """
-        Verarbeitet eine Telegram-Sprachnachricht und gibt die Transkription zurück.
+        self._ensure_started()
+        
+        user_queue = self._queues.get(user_id)
+        if self._queued >= self.max_queue or (user_queue and len(user_queue) >= self.max_per_user):
+            raise TranscriptionQueueFull()
+        
+        ahead = self._jobs_ahead(user_id)
+        idle_workers = self.workers - self._active
+        position = 0 if ahead < idle_workers else ahead - idle_workers + 1
+        
+        future = asyncio.get_running_loop().create_future()
+        if user_queue is None:
+            user_queue = self._queues[user_id] = deque()
+        user_queue.append((future, audio))
+        self._queued += 1
+        self._wakeup.set()
+        
+        return future, position
+    
+    def _next_job(self):
+        """Nimmt den nächsten Auftrag des Benutzers, der an der Reihe ist."""
+        if not self._queues:
+            return None
+        user_id, queue = next(iter(self._queues.items()))
+        job = queue.popleft()
+        self._queued -= 1
+        if queue:
+            self._queues.move_to_end(user_id)
+        else:
+            del self._queues[user_id]
+        return job
+    
+    async def _worker(self):
+        """Arbeitet Aufträge ab und führt die blockierende Transkription im Thread-Pool aus."""
+        loop = asyncio.get_running_loop()
+        while True:
+            job = self._next_job()
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            
+            future, audio = job
+            self._active += 1
+            try:
+                result = await loop.run_in_executor(self._executor, self._transcribe, audio)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self._active -= 1
+    
+    def stats(self):
+        """Gibt den aktuellen Zustand der Warteschlange zurück."""
+        return {
+            "queued": self._queued,
+            "active": self._active,
+            "users_waiting": len(self._queues)
+        }
+
+
+class TelegramAudioProcessor:
+    def __init__(self, memory_limit=VOICE_MEMORY_LIMIT_BYTES):
+        # Obergrenze für Sprachnachrichten, die komplett im Speicher gehalten werden
+        self.memory_limit = memory_limit
+        # Spracherkennungs-Backend (OpenAI oder lokal), einmal geladen und warm gehalten
+        self.stt = get_stt_backend()
+        self.scheduler = TranscriptionScheduler(self.transcribe)
+    
+    def transcribe(self, voice_file):
+        """
+        Transkribiert eine Sprachnachricht (blockierend) und gibt sie danach frei.
         
-        :param voice_file: Pfad zur temporären Sprachdatei
+        :param voice_file: Dateiobjekt im Speicher oder Pfad zur temporären Sprachdatei
         :return: Transkription als Text
         """
         try:
-            print(f"Transkribiere Sprachnachricht...")
+            print(f"Transkribiere Sprachnachricht ({self.stt.name})...")
             
-            with open(voice_file, "rb") as audio_file:
-                transcription = openai.Audio.transcribe(
-                    model="whisper-1",
-                    file=audio_file
-                )
+            # Stille kürzen und heruntersampeln, um Upload und Rechenzeit zu sparen
+            prepared = preprocess_audio(voice_file, "ogg")
+            
+            if isinstance(prepared, str):
+                with open(prepared, "rb") as audio_file:
+                    transcript_text = self.stt.transcribe(audio_file)
+            else:
+                prepared.seek(0)
+                transcript_text = self.stt.transcribe(prepared)
             
-            transcript_text = transcription.get("text", "")
             print(f"Transkription: {transcript_text}")
             return transcript_text
             
@@ -34,26 +168,70 @@ class TelegramAudioProcessor:
             print(f"Fehler bei der Transkription: {e}")
             return None
         finally:
-            # Temporäre Datei löschen
+            self.discard_voice_file(voice_file)
+    
+    def discard_voice_file(self, voice_file):
+        """Löscht die temporäre Datei bzw. gibt den Puffer einer Sprachnachricht frei."""
+        if isinstance(voice_file, str):
             if os.path.exists(voice_file):
                 try:
                     os.remove(voice_file)
                 except:
                     pass
+        else:
+            voice_file.close()
+    
+    def submit_voice_message(self, user_id, voice_file):
+        """
+        Reiht eine Sprachnachricht in die Transkriptions-Warteschlange ein.
+        
+        :return: Tupel aus Future mit dem Transkript und Warteposition (0 = startet sofort)
+        :raises TranscriptionQueueFull: wenn die Warteschlange voll ist
+        """
+        return self.scheduler.submit(user_id, voice_file)
+        
+    async def process_voice_message(self, voice_file, user_id=None):
+        """
+        Verarbeitet eine Telegram-Sprachnachricht und gibt die Transkription zurück.
+        
+        :param voice_file: Dateiobjekt im Speicher oder Pfad zur temporären Sprachdatei
+        :param user_id: Telegram-Benutzer-ID für die faire Verteilung
+        :return: Transkription als Text
+        :raises TranscriptionQueueFull: wenn die Warteschlange voll ist
+        """
+        try:
+            future, _ = self.submit_voice_message(user_id, voice_file)
+        except TranscriptionQueueFull:
+            self.discard_voice_file(voice_file)
+            raise
+        return await future
                 
     async def download_voice_message(self, voice_message):
         """
         Lädt eine Sprachnachricht von Telegram herunter.
         
+        Nachrichten bis zur Speichergrenze werden direkt in einen Puffer geladen,
+        größere Nachrichten in eine temporäre Datei.
+        
         :param voice_message: Telegram Voice-Objekt
-        :return: Pfad zur lokalen Datei
+        :return: BytesIO-Objekt oder Pfad zur lokalen Datei
         """
         try:
-            # Temporäre Datei erstellen
-            temp_file = tempfile.mktemp(suffix=".ogg")
-            
-            # Datei herunterladen
             voice_file = await voice_message.get_file()
+            file_size = voice_message.file_size or voice_file.file_size or 0
+            
+            if file_size and file_size <= self.memory_limit:
+                # Datei direkt in den Speicher laden
+                data = await voice_file.download_as_bytearray()
+                buffer = io.BytesIO(data)
+                # Die Whisper-API leitet das Format aus dem Dateinamen ab
+                buffer.name = "voice.ogg"
+                print(f"Sprachnachricht in den Speicher geladen ({len(data)} Bytes)")
+                return buffer
+            
+            # Fallback: Temporäre Datei mit sicherem Namen erstellen
+            fd, temp_file = tempfile.mkstemp(suffix=".ogg")
+            os.close(fd)
             await voice_file.download_to_drive(temp_file)
             
             print(f"Sprachnachricht heruntergeladen nach {temp_file}")
@@ -61,4 +239,4 @@ class TelegramAudioProcessor:
             
         except Exception as e:
             print(f"Fehler beim Herunterladen der Sprachnachricht: {e}")
-            return None 
\ No newline at end of file
+            return None
@@ -0,0 +1,30 @@
+from intent_cache import IntentCache, normalize_text
+
+ADDR_A = "addr_test1qz2fxv2umyhttkxyxp8x0dlpdt3k6cwng5pxj3jhsydzer3jcu5d8ps7zex2k2xt3uqxgjqnnj83ws8lhrn648jjxtwq2ytjqp"
+ADDR_B = "addr_test1qpu5vlrf4xkxv2qpwngf6cjhtw542ayty80v8dyr49rf5ewvxwdrt70qlcpeeagscasafhffqsxy36t90ldv06wqrk2qum8x5w"
+
+
+def test_address_placeholders_do_not_count_as_numbers():
+    template, values = normalize_text(f"Sende 5 ADA an {ADDR_A} statt {ADDR_B}")
+    assert template == "sende <num0> ada an <addr0> statt <addr1>"
+    assert values["num"] == ["5"]
+
+
+def test_two_addresses_replay_amount_of_new_input():
+    cache = IntentCache()
+    cache.put(f"nicht an {ADDR_A} sondern an {ADDR_B} 1 ada", {
+        "intent": "send_ada",
+        "entities": {"amount": 1, "recipient_address": ADDR_B}
+    })
+    result = cache.get(f"nicht an {ADDR_B} sondern an {ADDR_A} 25 ada")
+    assert result["entities"] == {"amount": 25.0, "recipient_address": ADDR_A}
+
+
+def test_multiple_numbers_keep_their_positions():
+    cache = IntentCache()
+    cache.put(f"von 3 wallets sende 7,5 ada an {ADDR_A}", {
+        "intent": "send_ada",
+        "entities": {"amount": 7.5, "recipient_address": ADDR_A}
+    })
+    result = cache.get(f"von 2 wallets sende 40 ada an {ADDR_B}")
+    assert result["entities"] == {"amount": 40.0, "recipient_address": ADDR_B}
@@ -1,39 +1,276 @@
-import pyttsx3
-from config import TTS_ENABLED, TTS_RATE
+import io
+import os
+import queue
+import asyncio
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import Future
+from cache import LRUCache
+from config import TTS_ENABLED, TTS_RATE, TTS_CACHE_DIR, TTS_CACHE_MAX_ENTRIES, TTS_CACHE_MAX_FILES
+
+
+class SpeechCache:
+    """
+    LRU-Cache gerenderter Sprachausgaben (OGG/Opus).
+
+    Häufige Sätze (Kontostände, Bestätigungsfragen) liegen im Speicher; mit
+    Verzeichnis zusätzlich auf der Festplatte, sodass sie einen Neustart
+    überstehen. Auf der Festplatte werden die am längsten ungenutzten
+    Dateien (nach mtime) entfernt.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_entries=TTS_CACHE_MAX_ENTRIES, max_files=TTS_CACHE_MAX_FILES):
+        self.max_entries = max_entries
+        self.max_files = max_files
+        self.directory = Path(directory) if directory else None
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._file_count = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._file_count = sum(1 for _ in self.directory.glob("*.ogg"))
+
+    @staticmethod
+    def make_key(text, rate):
+        """Schlüssel aus Text und Sprechgeschwindigkeit."""
+        return hashlib.sha256(f"{rate}|{text}".encode()).hexdigest()
+
+    def _path(self, key):
+        return self.directory / f"{key}.ogg"
+
+    def get(self, key):
+        """Gibt die Audiodaten zurück oder None."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                data = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                data = None
+            if data is not None:
+                self.disk_hits += 1
+                self._remember(key, data)
+                return data
+
+        self.misses += 1
+        return None
+
+    def put(self, key, data):
+        """Speichert Audiodaten im Speicher und auf der Festplatte."""
+        self._remember(key, data)
+        if self.directory is None:
+            return
+
+        path = self._path(key)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Fehler beim Speichern der Sprachausgabe: {e}")
+            return
+
+        with self._lock:
+            self._file_count += 1
+            prune = self._file_count > self.max_files
+        if prune:
+            self._prune()
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _prune(self):
+        """Entfernt die ältesten Dateien bis auf 90 % des Limits."""
+        files = sorted(self.directory.glob("*.ogg"), key=lambda path: path.stat().st_mtime)
+        keep = int(self.max_files * 0.9)
+        for path in files[:max(0, len(files) - keep)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self._file_count = min(len(files), keep)
+
+    def stats(self):
+        """Gibt Treffer-Statistiken zurück."""
+        return {
+            "entries": len(self._memory),
+            "files": self._file_count,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses
+        }
+
 
 class TextToSpeech:
-    def __init__(self):
+    """
+    Nicht blockierende Sprachausgabe.
+
+    Ein Hintergrund-Thread besitzt die pyttsx3-Engine (die nicht threadsicher
+    ist) und arbeitet eine Warteschlange ab; Aufrufer erhalten sofort ein
+    Future. Gerenderte Sätze kommen aus dem SpeechCache, gleichzeitige
+    Anfragen für denselben Satz teilen sich eine Synthese.
+    """
+
+    def __init__(self, cache=None):
         self.enabled = TTS_ENABLED
-        
-        if self.enabled:
-            try:
-                self.engine = pyttsx3.init()
-                self.engine.setProperty('rate', TTS_RATE)
-                print("Text-to-Speech Engine initialisiert.")
-            except Exception as e:
-                print(f"Fehler bei der Initialisierung der Text-to-Speech Engine: {e}")
-                self.enabled = False
-    
-    def speak(self, text):
-        """Gibt den Text als Sprache aus."""
+        self.rate = TTS_RATE
+        self.cache = cache or SpeechCache()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        # Cache-Schlüssel -> Future laufender Synthesen
+        self._rendering = {}
+        # Cache-Schlüssel -> Telegram-file_id bereits gesendeter Sprachnachrichten,
+        # begrenzt wie der Audio-Cache (Kontostände erzeugen ständig neue Sätze)
+        self._file_ids = LRUCache(max_entries=self.cache.max_entries, ttl=float("inf"))
+
+    def _submit(self, kind, value):
+        """Reiht einen Auftrag ein und startet den Worker beim ersten Aufruf."""
+        future = Future()
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tts", daemon=True)
+                self._thread.start()
+        self._queue.put((kind, value, future))
+        return future
+
+    def _init_engine(self):
+        """Initialisiert die Engine im Worker-Thread."""
         if not self.enabled:
-            print(f"TTS (deaktiviert): {text}")
-            return
-        
+            return None
         try:
-            print(f"TTS: {text}")
-            self.engine.say(text)
-            self.engine.runAndWait()
+            import pyttsx3
+            engine = pyttsx3.init()
+            engine.setProperty('rate', self.rate)
+            print("Text-to-Speech Engine initialisiert.")
+            return engine
         except Exception as e:
-            print(f"Fehler bei der Sprachausgabe: {e}")
-            print(f"Text: {text}")
-    
+            print(f"Fehler bei der Initialisierung der Text-to-Speech Engine: {e}")
+            self.enabled = False
+            return None
+
+    def _run(self):
+        """Worker-Schleife: einziger Thread, der die Engine verwendet."""
+        engine = self._init_engine()
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            kind, value, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if kind == "rate":
+                    self.rate = value
+                    if engine:
+                        engine.setProperty('rate', value)
+                    future.set_result(True)
+                elif not engine:
+                    print(f"TTS (deaktiviert): {value}")
+                    future.set_result(None)
+                elif kind == "speak":
+                    print(f"TTS: {value}")
+                    engine.say(value)
+                    engine.runAndWait()
+                    future.set_result(True)
+                else:
+                    future.set_result(self._render(engine, value))
+            except Exception as e:
+                print(f"Fehler bei der Sprachausgabe: {e}")
+                print(f"Text: {value}")
+                future.set_result(None)
+
+    def _render(self, engine, text):
+        """Synthetisiert einen Satz als OGG/Opus (für Telegram-Sprachnachrichten)."""
+        from pydub import AudioSegment
+
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            segment = AudioSegment.from_file(path).set_channels(1)
+            output = io.BytesIO()
+            segment.export(output, format="ogg", codec="libopus", bitrate="24k")
+            return output.getvalue()
+        finally:
+            os.remove(path)
+
+    def speak(self, text):
+        """
+        Gibt den Text über die Lautsprecher aus, ohne den Aufrufer zu blockieren.
+
+        :return: Future, das nach der Ausgabe erfüllt ist
+        """
+        return self._submit("speak", text)
+
+    def render(self, text):
+        """
+        Gibt die Sprachausgabe eines Textes als OGG/Opus-Bytes zurück.
+
+        :return: Future mit den Audiodaten (None, wenn TTS nicht verfügbar ist)
+        """
+        key = SpeechCache.make_key(text, self.rate)
+        data = self.cache.get(key)
+        if data is not None:
+            future = Future()
+            future.set_result(data)
+            return future
+
+        with self._thread_lock:
+            future = self._rendering.get(key)
+            if future is not None:
+                return future
+            future = self._rendering[key] = Future()
+
+        def done(rendered):
+            data = rendered.result()
+            if data:
+                self.cache.put(key, data)
+            with self._thread_lock:
+                self._rendering.pop(key, None)
+            future.set_result(data)
+
+        self._submit("render", text).add_done_callback(done)
+        return future
+
+    async def render_async(self, text):
+        """Async-Variante von render für die Telegram-Handler."""
+        return await asyncio.wrap_future(self.render(text))
+
+    def get_file_id(self, text):
+        """Gibt die Telegram-file_id eines bereits gesendeten Satzes zurück oder None."""
+        return self._file_ids.get(SpeechCache.make_key(text, self.rate))
+
+    def set_file_id(self, text, file_id):
+        """Merkt sich die Telegram-file_id eines gesendeten Satzes für erneutes Senden ohne Upload."""
+        self._file_ids.set(SpeechCache.make_key(text, self.rate), file_id)
+
     def set_rate(self, rate):
         """Ändert die Sprechgeschwindigkeit."""
-        if not self.enabled:
-            return
-        
-        try:
-            self.engine.setProperty('rate', rate)
-        except Exception as e:
-            print(f"Fehler beim Ändern der Sprechgeschwindigkeit: {e}") 
\ No newline at end of file
+        return self._submit("rate", rate)
+
+    def shutdown(self):
+        """Beendet den Worker-Thread nach den ausstehenden Aufträgen."""
+        if self._thread is not None:
+            self._queue.put(None)
@@ -0,0 +1,92 @@
+import time
+from config import TX_WATCH_TIMEOUT
+
+
+class TransactionWatcher:
+    """
+    Überwacht eingereichte Transaktionen und meldet ihre Bestätigung.
+
+    Die Transaktionslisten neuer Blöcke (vom BlockFollower) werden mit allen
+    offenen Hashes auf einmal abgeglichen, statt jede Transaktion einzeln
+    abzufragen. Solange keine Transaktion offen ist, ist der Watcher nicht
+    beim BlockFollower registriert.
+    """
+
+    def __init__(self, cardano_manager, block_follower, timeout=TX_WATCH_TIMEOUT):
+        self.cardano_manager = cardano_manager
+        self.block_follower = block_follower
+        self.timeout = timeout
+        # network -> {tx_hash: {"notify", "since"}}
+        self._pending = {}
+
+    def track(self, tx_hash, network, notify):
+        """
+        Nimmt eine Transaktion in die Überwachung auf.
+
+        :param tx_hash: Hash der eingereichten Transaktion
+        :param network: 'testnet' oder 'mainnet'
+        :param notify: Async-Callback, das das Ergebnis-Dict erhält
+        """
+        self._pending.setdefault(network, {})[tx_hash] = {
+            "notify": notify,
+            "since": time.monotonic()
+        }
+        self.block_follower.add_listener(network, self._on_blocks)
+
+    def pending_count(self, network=None):
+        """Anzahl der offenen Transaktionen (gesamt oder pro Netzwerk)."""
+        if network:
+            return len(self._pending.get(network, {}))
+        return sum(len(pending) for pending in self._pending.values())
+
+    async def _on_blocks(self, network, blocks):
+        """Gleicht neue Blöcke mit den offenen Transaktionen ab."""
+        api = self.cardano_manager.get_api(network)
+        pending = self._pending.get(network, {})
+
+        for block in blocks:
+            if not pending or not api:
+                break
+            if not block.tx_count:
+                continue
+            tx_hashes = await self.cardano_manager._run_blocking(
+                api.block_transactions, block.hash, gather_pages=True
+            )
+            for tx_hash in pending.keys() & set(tx_hashes):
+                entry = pending.pop(tx_hash)
+                await self._notify(entry, {
+                    "success": True,
+                    "tx_hash": tx_hash,
+                    "block": block.hash,
+                    "block_height": block.height,
+                    "network": network
+                })
+
+        await self._expire(network)
+        if not pending:
+            self.block_follower.remove_listener(network, self._on_blocks)
+
+    async def _expire(self, network):
+        """Meldet Transaktionen, die nach Ablauf der Wartezeit nicht gefunden wurden."""
+        pending = self._pending.get(network, {})
+        now = time.monotonic()
+        expired = [tx_hash for tx_hash, entry in pending.items() if now - entry["since"] > self.timeout]
+        for tx_hash in expired:
+            entry = pending.pop(tx_hash)
+            # Einzelabfrage als letzte Prüfung, falls ein Block verpasst wurde
+            status = await self.cardano_manager.get_transaction_status_async(tx_hash, network)
+            if "error" in status:
+                status = {
+                    "error": "Transaktion wurde nicht rechtzeitig bestätigt",
+                    "tx_hash": tx_hash,
+                    "network": network
+                }
+            await self._notify(entry, status)
+
+    @staticmethod
+    async def _notify(entry, result):
+        """Ruft das Callback auf, ohne die Überwachung bei Fehlern abzubrechen."""
+        try:
+            await entry["notify"](result)
+        except Exception as e:
+            print(f"Fehler beim Senden der Benachrichtigung: {e}")
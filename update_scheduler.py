@@ -0,0 +1,92 @@
+import time
+import asyncio
+import functools
+from config import UPDATE_MAX_CONCURRENCY
+
+
+class _UserQueue:
+    """Warteschlange eines Benutzers: FIFO-Lock plus Anzahl wartender/laufender Updates."""
+
+    __slots__ = ("lock", "depth")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.depth = 0
+
+
+class UpdateScheduler:
+    """
+    Reihenfolge- und Parallelitätskontrolle für Telegram-Handler.
+
+    Updates desselben Benutzers laufen strikt nacheinander in Eingangsreihenfolge
+    (asyncio.Lock bedient Wartende FIFO), damit z.B. eine Sprachnachricht und das
+    folgende "ja" nicht überholen. Verschiedene Benutzer laufen parallel, insgesamt
+    aber höchstens ``max_concurrency`` Handler gleichzeitig.
+    """
+
+    def __init__(self, max_concurrency=UPDATE_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        # user_id -> _UserQueue, nur solange Updates des Benutzers offen sind
+        self._users = {}
+        self.running = 0
+        self.processed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def run(self, user_id, handler, *args, **kwargs):
+        """
+        Führt einen Handler in der Warteschlange des Benutzers aus.
+
+        :return: Rückgabewert des Handlers (z.B. der nächste Konversationsstatus)
+        """
+        if self._semaphore is None:
+            # Erst im laufenden Event-Loop anlegen
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        queue = self._users.get(user_id)
+        if queue is None:
+            queue = self._users[user_id] = _UserQueue()
+        queue.depth += 1
+        enqueued = time.monotonic()
+        try:
+            async with queue.lock:
+                async with self._semaphore:
+                    wait = time.monotonic() - enqueued
+                    self.total_wait += wait
+                    self.max_wait = max(self.max_wait, wait)
+                    self.running += 1
+                    try:
+                        return await handler(*args, **kwargs)
+                    finally:
+                        self.running -= 1
+                        self.processed += 1
+        finally:
+            queue.depth -= 1
+            if queue.depth == 0:
+                self._users.pop(user_id, None)
+
+    def wrap(self, handler):
+        """Gibt einen Telegram-Handler zurück, der über den Scheduler läuft."""
+        @functools.wraps(handler)
+        async def scheduled(update, context):
+            return await self.run(update.effective_user.id, handler, update, context)
+        return scheduled
+
+    def depth(self, user_id=None):
+        """Offene Updates eines Benutzers oder aller Benutzer (wartend und laufend)."""
+        if user_id is not None:
+            queue = self._users.get(user_id)
+            return queue.depth if queue else 0
+        return sum(queue.depth for queue in self._users.values())
+
+    def stats(self):
+        """Gibt Warteschlangentiefe und Wartezeiten zurück."""
+        return {
+            "queued": self.depth() - self.running,
+            "running": self.running,
+            "active_users": len(self._users),
+            "processed": self.processed,
+            "avg_wait_ms": round(self.total_wait / self.processed * 1000, 1) if self.processed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1)
+        }
@@ -0,0 +1,85 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from cache import LRUCache
+from config import USER_STATE_PATH, USER_STATE_MAX_ENTRIES, PENDING_TX_TTL
+
+
+class UserStateStore:
+    """
+    Konversationszustand pro Benutzer.
+
+    Einstellungen (z.B. das gewählte Netzwerk) liegen in einem begrenzten
+    LRU-Cache und werden bei konfiguriertem Pfad in SQLite gespeichert, sodass
+    sie einen Neustart überstehen. Transaktionen, die auf Bestätigung warten,
+    werden nur im Speicher gehalten und verfallen nach ``pending_ttl`` Sekunden;
+    nach einem Neustart gibt es ohnehin keine offene Konversation mehr.
+    """
+
+    def __init__(self, db_path=USER_STATE_PATH, max_entries=USER_STATE_MAX_ENTRIES, pending_ttl=PENDING_TX_TTL):
+        self._settings = LRUCache(max_entries=max_entries, ttl=float("inf"))
+        self._pending = LRUCache(max_entries=max_entries, ttl=pending_ttl)
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if db_path:
+            path = Path(db_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS user_settings (user_id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+                )
+
+    def _load_settings(self, user_id):
+        """Gibt die Einstellungen eines Benutzers zurück (Cache, sonst SQLite)."""
+        key = str(user_id)
+        settings = self._settings.get(key)
+        if settings is not None:
+            return settings
+
+        settings = {}
+        if self._conn is not None:
+            row = self._conn.execute(
+                "SELECT data FROM user_settings WHERE user_id = ?", (key,)
+            ).fetchone()
+            if row:
+                settings = json.loads(row[0])
+        self._settings.set(key, settings)
+        return settings
+
+    def get_setting(self, user_id, name, default=None):
+        """Liest eine Einstellung eines Benutzers."""
+        return self._load_settings(user_id).get(name, default)
+
+    def set_setting(self, user_id, name, value):
+        """Schreibt eine Einstellung eines Benutzers (bei SQLite sofort dauerhaft)."""
+        key = str(user_id)
+        with self._lock:
+            settings = dict(self._load_settings(user_id), **{name: value})
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO user_settings (user_id, data) VALUES (?, ?)",
+                        (key, json.dumps(settings))
+                    )
+            self._settings.set(key, settings)
+
+    def set_pending(self, user_id, transaction):
+        """Speichert eine Transaktion, die auf Bestätigung wartet."""
+        self._pending.set(str(user_id), transaction)
+
+    def get_pending(self, user_id):
+        """Gibt die offene Transaktion eines Benutzers zurück oder None, wenn keine (mehr) besteht."""
+        return self._pending.get(str(user_id))
+
+    def pop_pending(self, user_id):
+        """Gibt die offene Transaktion zurück und entfernt sie."""
+        transaction = self.get_pending(user_id)
+        self._pending.invalidate(str(user_id))
+        return transaction
+
+    def stats(self):
+        """Gibt Größe und Trefferquoten der Zustands-Caches zurück."""
+        return {"settings": self._settings.stats(), "pending": self._pending.stats()}
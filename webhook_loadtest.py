@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Offline-Lasttest für den Webhook-Eingang.
+
+Erzeugt Telegram-ähnliche Updates und sendet sie über mehrere Keep-Alive-
+Verbindungen an einen Webhook-Server. Ohne --url wird ein lokaler Server
+gestartet, dessen Warteschlange die Updates nur zählt; so lässt sich der
+Eingangspfad ohne Telegram und ohne Bot messen.
+
+Beispiel:
+    python webhook_loadtest.py --updates 5000 --concurrency 50
+    python webhook_loadtest.py --url http://127.0.0.1:8443/telegram --secret geheim
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+from urllib.parse import urlparse
+from webhook_server import WebhookServer
+
+SAMPLE_TEXTS = [
+    "Wie viel ADA habe ich?",
+    "Zeige meinen Kontostand",
+    "Hilfe",
+    "Sende 5 ADA an addr_test1qz2fxv2umyhttkxyxp8x0dlpdt3k6cwng5pxj3jhsydzer3jcu5d8ps7zex2k2xt3uqxgjqnnj83ws8lhrn648jjxtwq2ytjqp",
+]
+
+
+def make_update(update_id, user_id, text=None):
+    """Erzeugt ein Update im Format der Telegram Bot API (Textnachricht)."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private", "first_name": f"Test{user_id}"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"Test{user_id}", "language_code": "de"},
+            "text": text or random.choice(SAMPLE_TEXTS)
+        }
+    }
+
+
+def generate_updates(count, users):
+    """Erzeugt ``count`` Updates, verteilt auf ``users`` zufällige Benutzer."""
+    return [make_update(update_id, random.randint(1, users)) for update_id in range(1, count + 1)]
+
+
+async def _send_all(host, port, path, secret, bodies, latencies, statuses):
+    """Sendet Updates nacheinander über eine Keep-Alive-Verbindung."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            request = (
+                f"POST {path} HTTP/1.1\r\n"
+                f"Host: {host}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"X-Telegram-Bot-Api-Secret-Token: {secret}\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode() + body
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            latencies.append(time.perf_counter() - started)
+            status = int(head.split(b" ", 2)[1])
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run_load_test(updates, concurrency, users, url=None, secret=None):
+    """
+    Führt den Lasttest aus und gibt die Messwerte zurück.
+
+    :param url: Ziel-URL eines laufenden Webhook-Servers; ohne URL wird lokal gestartet
+    :return: Dict mit Durchsatz und Latenzen
+    """
+    server = None
+    received = []
+    if url is None:
+        secret = secret or "loadtest"
+        server = WebhookServer(secret, received.append, host="127.0.0.1", port=0)
+        await server.start()
+        host, port, path = "127.0.0.1", server.port, server.path
+    else:
+        parsed = urlparse(url)
+        host, port, path = parsed.hostname, parsed.port or 80, parsed.path or "/"
+
+    bodies = [json.dumps(update).encode() for update in generate_updates(updates, users)]
+    chunks = [bodies[i::concurrency] for i in range(concurrency)]
+    latencies = []
+    statuses = {}
+
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _send_all(host, port, path, secret, chunk, latencies, statuses) for chunk in chunks if chunk
+    ])
+    elapsed = time.perf_counter() - started
+
+    if server is not None:
+        await server.stop()
+
+    latencies.sort()
+    return {
+        "updates": updates,
+        "statuses": statuses,
+        "received": len(received) if server is not None else None,
+        "seconds": round(elapsed, 3),
+        "updates_per_second": round(updates / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lasttest für den Telegram-Webhook-Eingang")
+    parser.add_argument("--updates", type=int, default=2000, help="Anzahl der Updates")
+    parser.add_argument("--concurrency", type=int, default=20, help="Gleichzeitige Verbindungen")
+    parser.add_argument("--users", type=int, default=500, help="Anzahl simulierter Benutzer")
+    parser.add_argument("--url", help="Webhook-URL eines laufenden Bots (sonst lokaler Server)")
+    parser.add_argument("--secret", help="Secret-Token des Webhooks")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load_test(args.updates, args.concurrency, args.users, args.url, args.secret))
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
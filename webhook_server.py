@@ -0,0 +1,160 @@
+import hmac
+import json
+import time
+import asyncio
+from config import WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH
+
+# Maximale Größe eines Updates (Telegram-Updates sind wenige KB groß)
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADER_BYTES = 16 * 1024
+
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    503: "Service Unavailable"
+}
+
+
+class WebhookQueueFull(Exception):
+    """Das Update konnte nicht angenommen werden; Telegram stellt es erneut zu."""
+
+
+class WebhookServer:
+    """
+    Schlanker asyncio-HTTP-Server für Telegram-Webhooks.
+
+    Prüft das Secret-Token aus dem Header X-Telegram-Bot-Api-Secret-Token,
+    dekodiert das Update und übergibt es ohne Umweg an ``enqueue``. Die Antwort
+    folgt sofort, die Verarbeitung läuft in der Handler-Pipeline. Verbindungen
+    bleiben offen (Keep-Alive), wie Telegram es bei mehreren Updates nutzt.
+    """
+
+    def __init__(self, secret_token, enqueue, host=WEBHOOK_LISTEN, port=WEBHOOK_PORT, path=WEBHOOK_PATH):
+        """
+        :param secret_token: Beim setWebhook hinterlegtes Secret-Token
+        :param enqueue: Callback, das das Update-Dict übernimmt (darf WebhookQueueFull auslösen)
+        """
+        if not secret_token:
+            raise ValueError("Für den Webhook-Modus ist ein Secret-Token erforderlich")
+        self.secret_token = secret_token.encode()
+        self.enqueue = enqueue
+        self.host = host
+        self.port = port
+        self.path = path
+        self._server = None
+        self.stats = {"accepted": 0, "rejected": 0, "unauthorized": 0, "ingest_seconds": 0.0}
+
+    async def start(self):
+        """Startet den Server und gibt den tatsächlich gebundenen Port zurück."""
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"Webhook-Server lauscht auf {self.host}:{self.port}{self.path}")
+        return self.port
+
+    async def serve_forever(self):
+        """Startet den Server und läuft bis zum Abbruch."""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        """Beendet den Server."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_connection(self, reader, writer):
+        """Beantwortet Anfragen einer Verbindung, bis der Client sie schließt."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                method, target, headers = self._parse_head(head)
+                if method is None:
+                    await self._respond(writer, 400, close=True)
+                    break
+
+                try:
+                    length = int(headers.get("content-length", "0"))
+                except ValueError:
+                    length = -1
+                if length < 0 or length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status = self._process(method, target, headers, body)
+                close = headers.get("connection", "").lower() == "close"
+                await self._respond(writer, status, close=close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _parse_head(head):
+        """Zerlegt Anfragezeile und Header; gibt (None, None, None) bei ungültigem Format zurück."""
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            return None, None, None
+        headers = {}
+        for line in lines[1:]:
+            name, separator, value = line.partition(":")
+            if separator:
+                headers[name.strip().lower()] = value.strip()
+        return method, target, headers
+
+    def _process(self, method, target, headers, body):
+        """Prüft eine Anfrage und reiht das Update ein; gibt den HTTP-Status zurück."""
+        if target.split("?", 1)[0] != self.path:
+            return 404
+        if method != "POST":
+            return 405
+        if not hmac.compare_digest(headers.get(SECRET_HEADER, "").encode(), self.secret_token):
+            self.stats["unauthorized"] += 1
+            return 401
+
+        started = time.perf_counter()
+        try:
+            update = json.loads(body)
+        except ValueError:
+            return 400
+        if not isinstance(update, dict) or "update_id" not in update:
+            return 400
+
+        try:
+            self.enqueue(update)
+        except WebhookQueueFull:
+            # Telegram wiederholt die Zustellung bei Fehlern
+            self.stats["rejected"] += 1
+            return 503
+        self.stats["accepted"] += 1
+        self.stats["ingest_seconds"] += time.perf_counter() - started
+        return 200
+
+    @staticmethod
+    async def _respond(writer, status, close=False):
+        """Sendet eine leere Antwort."""
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Length: 0\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode()
+        )
+        await writer.drain()